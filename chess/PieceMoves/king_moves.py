@@ -1,31 +1,42 @@
-from ..bitboard import set_bit, clear_bit, test_bit, coords_to_square, square_to_coords, in_bounds
+from ..bitboard import set_bit, coords_to_square, moves_from_targets
 from ..move import Move
+from ..helpers.attack_tables import KING_ATTACKS
 
-def generate_king_moves(game_state, is_white):
+def _row_mask(row, cols):
+    """Bitboard of the given columns on one row."""
+    mask = 0
+    for col in cols:
+        mask = set_bit(mask, coords_to_square(row, col))
+    return mask
+
+# Squares between king and rook that must be empty to castle, and the king's destination
+WHITE_KINGSIDE_PATH, WHITE_QUEENSIDE_PATH = _row_mask(7, range(5, 7)), _row_mask(7, range(1, 4))
+BLACK_KINGSIDE_PATH, BLACK_QUEENSIDE_PATH = _row_mask(0, range(5, 7)), _row_mask(0, range(1, 4))
+G1, C1, G8, C8 = coords_to_square(7, 6), coords_to_square(7, 2), coords_to_square(0, 6), coords_to_square(0, 2)
+
+def generate_king_moves(game_state, is_white, own_occupancy, opponent_occupancy, allow_castling=True):
     moves = []
     king = game_state.whiteKing if is_white else game_state.blackKing
-    opponent_occupancy = game_state.get_black_occupancy() if is_white else game_state.get_white_occupancy()
-    own_occupancy = game_state.get_white_occupancy() if is_white else game_state.get_black_occupancy()
-    king_moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    occupancy = own_occupancy | opponent_occupancy
+    piece = 'wK' if is_white else 'bK'
 
-    for sq in range(64):
-        if test_bit(king, sq):
-            row, col = square_to_coords(sq)
-            for dr, dc in king_moves:
-                new_row, new_col = row + dr, col + dc
-                if in_bounds(new_row, new_col):
-                    new_sq = coords_to_square(new_row, new_col)
-                    if not test_bit(own_occupancy, new_sq):
-                        moves.append(Move('wK' if is_white else 'bK', sq, new_sq, isCapture=test_bit(opponent_occupancy, new_sq)))
-            # Castling moves
-            if is_white and not game_state.whiteKingMoved:
-                if not game_state.whiteRookHMoved and not any(test_bit(game_state.get_occupancy(), coords_to_square(7, c)) for c in range(5, 7)):
-                    moves.append(Move('wK', sq, coords_to_square(7, 6), isCastle=True))
-                if not game_state.whiteRookAMoved and not any(test_bit(game_state.get_occupancy(), coords_to_square(7, c)) for c in range(1, 4)):
-                    moves.append(Move('wK', sq, coords_to_square(7, 2), isCastle=True))
-            elif not is_white and not game_state.blackKingMoved:
-                if not game_state.blackRookHMoved and not any(test_bit(game_state.get_occupancy(), coords_to_square(0, c)) for c in range(5, 7)):
-                    moves.append(Move('bK', sq, coords_to_square(0, 6), isCastle=True))
-                if not game_state.blackRookAMoved and not any(test_bit(game_state.get_occupancy(), coords_to_square(0, c)) for c in range(1, 4)):
-                    moves.append(Move('bK', sq, coords_to_square(0, 2), isCastle=True))
+    while king:
+        lsb = king & -king
+        king ^= lsb
+        sq = lsb.bit_length() - 1
+        targets = KING_ATTACKS[sq] & ~own_occupancy
+        moves_from_targets(piece, sq, targets, opponent_occupancy, moves)
+        # Castling moves
+        if not allow_castling:
+            continue
+        if is_white and not game_state.whiteKingMoved:
+            if not game_state.whiteRookHMoved and not occupancy & WHITE_KINGSIDE_PATH:
+                moves.append(Move('wK', sq, G1, isCastle=True))
+            if not game_state.whiteRookAMoved and not occupancy & WHITE_QUEENSIDE_PATH:
+                moves.append(Move('wK', sq, C1, isCastle=True))
+        elif not is_white and not game_state.blackKingMoved:
+            if not game_state.blackRookHMoved and not occupancy & BLACK_KINGSIDE_PATH:
+                moves.append(Move('bK', sq, G8, isCastle=True))
+            if not game_state.blackRookAMoved and not occupancy & BLACK_QUEENSIDE_PATH:
+                moves.append(Move('bK', sq, C8, isCastle=True))
     return moves
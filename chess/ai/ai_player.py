@@ -1,86 +1,460 @@
+import math
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from time import perf_counter
+
 from chess.movegen import generate_all_moves
 from chess.ai.evaluation import evaluate_board
+from chess.helpers.check_detection import is_square_attacked
 
 PIECE_VALUES = {
     'wP': 1, 'wN': 3, 'wB': 3, 'wR': 5, 'wQ': 9, 'wK': 1000,
     'bP': 1, 'bN': 3, 'bB': 3, 'bR': 5, 'bQ': 9, 'bK': 1000
 }
 
+# Capture ordering scores, MVV_LVA[victim][attacker] (most valuable victim, least valuable attacker).
+# A victim of None is an en passant capture: the target square is empty and the victim a pawn.
+MVV_LVA = {
+    victim: {
+        attacker: 1_000_000 + (PIECE_VALUES[victim] if victim else 1) * 10 - PIECE_VALUES[attacker]
+        for attacker in PIECE_VALUES
+    }
+    for victim in [*PIECE_VALUES, None]
+}
+
+# Transposition table entry flags
+EXACT = 0
+LOWER = 1  # stored value is a lower bound (search failed high)
+UPPER = 2  # stored value is an upper bound (search failed low)
+
+# Width of the zero window used to scout non-first moves in principal variation search.
+# Must be smaller than the smallest step between two evaluations (piece-square values step by 0.5).
+SCOUT_WINDOW = 0.01
+
+# Half-width of the aspiration window around the previous iteration's score (half a pawn)
+ASPIRATION_WINDOW = 0.5
+
+# Depth reduction of the null-move search, and the minimum depth at which it is tried
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+
+# The transposition table is emptied before a search once it holds more entries than this
+TT_SIZE = 1 << 20
+
+# Maximum number of positions kept in the move generation cache
+MOVE_CACHE_SIZE = 1 << 14
+
+# Nodes searched between polls of the progress callback and the deadline (power of two)
+POLL_INTERVAL = 512
+
+# Seconds between polls while waiting for the worker processes of a parallel search
+WORKER_POLL_SECONDS = 0.05
+
+class SearchAborted(Exception):
+    """Raised inside the search when the time limit has run out or the search was cancelled."""
+
 class AIPlayer:
-    def __init__(self, game_state, depth=2):
+    def __init__(self, game_state, depth=2, progress_callback=None, workers=1, time_limit=None):
         self.game_state = game_state
         self.depth = depth
+        # Optional time budget in seconds; the deepest fully searched iteration is played
+        self.time_limit = time_limit
+        self.deadline = None
+        # Set from another thread (see cancel()) to stop a running search
+        self.cancel_event = threading.Event()
+        # With workers > 1 the root moves of the final iteration are split across a process pool
+        self.workers = workers
+        self._pool = None
+        # Shared with the worker processes to stop their searches (see _parallel_root_search)
+        self._manager = None
+        self._worker_cancel_event = None
         self.current_evaluation = 0.0
         self.analyzed_positions = 0
+        # Called every POLL_INTERVAL nodes so the caller (e.g. the UI) can keep itself responsive
+        self.progress_callback = progress_callback
+        self.nodes = 0
+        # Transposition table: zobrist -> (depth, value, flag, best_move)
+        self.tt = {}
+        # Killer moves: ply -> last quiet move that caused a beta cutoff there
+        self.killers = {}
+        # Move generation cache: zobrist -> generated moves, bounded by MOVE_CACHE_SIZE, emptied every search
+        self.move_cache = {}
 
     def select_move(self):
         """
-        Select a move for the AI player using the minimax algorithm with alpha-beta pruning.
+        Select a move for the AI player using iterative deepening: search to depth 1, 2, ..., self.depth,
+        so each iteration can order its moves with what the previous one stored in the
+        transposition table and killer slots, and search inside an aspiration window
+        around the previous iteration's score.
         """
         if self.game_state.game_over:
             return None  # No moves possible when the game is over
 
-        best_move = None
-        best_value = float('-inf') if self.game_state.whiteToMove else float('inf')
-        alpha = float('-inf')
-        beta = float('inf')
-        all_moves = generate_all_moves(self.game_state)
         self.analyzed_positions = 0
+        self.nodes = 0
+        self.killers = {}
+        if len(self.tt) > TT_SIZE:
+            self.tt.clear()
+        self.move_cache.clear()
+        self.cancel_event.clear()
+        self.deadline = None if self.time_limit is None else perf_counter() + self.time_limit
+        history_length = len(self.game_state.move_history)
 
-        for move in all_moves:
+        best_move = None
+        best_value = 0.0
+        try:
+            for depth in range(1, self.depth + 1):
+                # The previous iteration's best move is searched first
+                if self.workers > 1 and depth == self.depth and depth > 1:
+                    best_move, best_value = self._parallel_root_search(depth, best_move)
+                elif depth == 1:
+                    best_move, best_value = self._root_search(depth)
+                else:
+                    best_move, best_value = self._aspiration_search(depth, best_value, best_move)
+                # Each iteration takes several times longer than the one before, so with less than
+                # half of the time budget left the next one would only be started to be aborted
+                if self.deadline is not None and perf_counter() > self.deadline - self.time_limit / 2:
+                    break
+        except SearchAborted:
+            # Take back the moves the interrupted iteration left on the board
+            while len(self.game_state.move_history) > history_length:
+                last_move = self.game_state.move_history[-1][0]
+                if last_move is None:
+                    self.game_state.unmake_null_move()
+                else:
+                    self.game_state.unmake_move(last_move)
+            if best_move is None:
+                # Not even depth 1 finished: fall back to the first legal move
+                all_moves = generate_all_moves(self.game_state)
+                best_move = all_moves[0] if all_moves else None
+
+        # Report the evaluation from White's point of view
+        self.current_evaluation = best_value if self.game_state.whiteToMove else -best_value
+        return best_move
+
+    def _aspiration_search(self, depth, previous_value, pv_move=None):
+        """
+        Search to 'depth' with a narrow window around 'previous_value'. If the result falls outside it,
+        re-search with that side of the window opened up. Return (best_move, best_value).
+        """
+        if not math.isfinite(previous_value):
+            # No window fits around an infinite score (e.g. the side to move had no moves)
+            return self._root_search(depth, pv_move=pv_move)
+        alpha = previous_value - ASPIRATION_WINDOW
+        beta = previous_value + ASPIRATION_WINDOW
+        while True:
+            best_move, best_value = self._root_search(depth, alpha, beta, pv_move)
+            if best_move is None or not math.isfinite(best_value):
+                # Without any root move there is nothing to re-search
+                return best_move, best_value
+            if best_value <= alpha:
+                alpha = float('-inf')  # Failed low
+            elif best_value >= beta:
+                beta = float('inf')  # Failed high
+            else:
+                return best_move, best_value
+
+    def _root_search(self, depth, alpha=float('-inf'), beta=float('inf'), pv_move=None):
+        """
+        Search every root move to 'depth' with principal variation search inside (alpha, beta),
+        starting with 'pv_move' if given.
+        Return (best_move, best_value), the value from the side to move's point of view;
+        a value outside the window is only a bound.
+        """
+        best_move = None
+        best_value = float('-inf')
+        all_moves = self._order_moves(generate_all_moves(self.game_state), pv_move, ply=0)
+
+        for i, move in enumerate(all_moves):
             self.game_state.make_move(move)
-            board_value = self.minimax(self.depth - 1, alpha, beta, not self.game_state.whiteToMove)
+            if i == 0:
+                value = -self.negamax(depth - 1, -beta, -alpha, 1)
+            else:
+                value = -self.negamax(depth - 1, -alpha - SCOUT_WINDOW, -alpha, 1)
+                if alpha < value < beta:
+                    value = -self.negamax(depth - 1, -beta, -alpha, 1)
             self.game_state.unmake_move(move)
 
-            if self.game_state.whiteToMove:
-                if board_value > best_value:
-                    best_value = board_value
-                    best_move = move
-                alpha = max(alpha, best_value)
-            else:
-                if board_value < best_value:
-                    best_value = board_value
+            if value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        return best_move, best_value
+
+    def _parallel_root_search(self, depth, pv_move=None):
+        """
+        Split the ordered root moves round-robin across the process pool; every worker searches
+        its share with a private transposition table. Return (best_move, best_value).
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._manager = multiprocessing.Manager()
+            self._worker_cancel_event = self._manager.Event()
+        self._worker_cancel_event.clear()
+
+        # Workers get the time left rather than the deadline, as clocks may differ between processes
+        time_left = None if self.deadline is None else max(0.0, self.deadline - perf_counter())
+        all_moves = self._order_moves(generate_all_moves(self.game_state), pv_move, ply=0)
+        shares = [share for share in (all_moves[i::self.workers] for i in range(self.workers)) if share]
+        futures = [
+            self._pool.submit(_search_moves, self.game_state, share, depth, time_left, self._worker_cancel_event)
+            for share in shares
+        ]
+
+        # Keep polling while the workers search, so the deadline and cancel() still apply
+        pending = set(futures)
+        try:
+            while pending:
+                _, pending = wait(pending, timeout=WORKER_POLL_SECONDS)
+                self._poll()
+        except SearchAborted:
+            self._worker_cancel_event.set()
+            for future in futures:
+                future.cancel()
+            raise
+
+        best_move = None
+        best_value = float('-inf')
+        for share, future in zip(shares, futures):
+            result = future.result()
+            if result is None:
+                # The worker ran out of time itself
+                raise SearchAborted
+            values, analyzed_positions = result
+            self.analyzed_positions += analyzed_positions
+            for move, value in zip(share, values):
+                if value > best_value:
+                    best_value = value
                     best_move = move
-                beta = min(beta, best_value)
+        return best_move, best_value
 
-            if beta <= alpha:
-                break
+    def cancel(self):
+        """
+        Stop a select_move() running in another thread; it returns the best move of the
+        deepest completed iteration.
+        """
+        self.cancel_event.set()
 
-        self.current_evaluation = best_value
-        return best_move
+    def close(self):
+        """Shut down the worker processes, if any were started."""
+        if self._pool is not None:
+            self._worker_cancel_event.set()
+            self._pool.shutdown()
+            self._pool = None
+            self._manager.shutdown()
+            self._manager = None
+            self._worker_cancel_event = None
+
+    def _order_moves(self, moves, tt_move=None, ply=0):
+        """
+        Order moves so the most promising are searched first: the transposition table move
+        (at the root, the previous iteration's best move),
+        then captures by MVV-LVA (most valuable victim, least valuable attacker),
+        then the killer move of this ply, then everything else.
+        Sorts 'moves' in place and returns it.
+        """
+        killer = self.killers.get(ply)
+        get_piece_at_square = self.game_state.get_piece_at_square
+        mvv_lva = MVV_LVA
+
+        def move_score(move):
+            if tt_move is not None and move.startSq == tt_move.startSq and move.endSq == tt_move.endSq:
+                return 10_000_000
+            if move.isCapture:
+                return mvv_lva[get_piece_at_square(move.endSq)][move.piece]
+            if killer is not None and move.startSq == killer.startSq and move.endSq == killer.endSq:
+                return 900_000
+            return 0
 
-    def minimax(self, depth, alpha, beta, is_maximizing):
+        moves.sort(key=move_score, reverse=True)
+        return moves
+
+    def negamax(self, depth, alpha, beta, ply=1, allow_null=True):
         """
-        Minimax algorithm with alpha-beta pruning to evaluate the board state.
+        Negamax search with alpha-beta pruning; scores are from the side to move's point of view.
+        Principal variation search: the first (best-ordered) move is searched with the full window,
+        the others with a zero window, and only re-searched if they turn out to beat alpha.
+        Null-move pruning: in zero-window nodes, if passing the turn still fails high at reduced depth,
+        the node is cut without searching any move.
+        Results are cached in the transposition table keyed by the Zobrist hash.
         """
-        if depth == 0 or self.game_state.game_over:
+        self.nodes += 1
+        if self.nodes & (POLL_INTERVAL - 1) == 0:
+            self._poll()
+
+        game_state = self.game_state
+        key = game_state.zobrist
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry is not None:
+            tt_depth, tt_value, tt_flag, tt_move = entry
+            if tt_depth >= depth:
+                if tt_flag == EXACT:
+                    return tt_value
+                if tt_flag == LOWER:
+                    alpha = max(alpha, tt_value)
+                else:
+                    beta = min(beta, tt_value)
+                if alpha >= beta:
+                    return tt_value
+
+        if game_state.game_over:
             self.analyzed_positions += 1
-            return evaluate_board(self.game_state)
+            return self._evaluate()
+        if depth == 0:
+            return self.quiesce(alpha, beta, ply)
 
-        all_moves = generate_all_moves(self.game_state)
+        # A zero window is SCOUT_WINDOW wide only up to float rounding, so compare with some slack
+        if (allow_null and depth >= NULL_MOVE_MIN_DEPTH and beta - alpha < 2 * SCOUT_WINDOW
+                and self._can_null_move()):
+            game_state.make_null_move()
+            null_eval = -self.negamax(depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + SCOUT_WINDOW, ply + 1, False)
+            game_state.unmake_null_move()
+            if null_eval >= beta:
+                return null_eval
+
+        all_moves = self._generate_moves()
         if not all_moves:
             self.analyzed_positions += 1
-            return evaluate_board(self.game_state)  # Return evaluation if no moves left
-
-        if is_maximizing:
-            max_eval = float('-inf')
-            for move in all_moves:
-                self.game_state.make_move(move)
-                eval = self.minimax(depth - 1, alpha, beta, False)
-                self.game_state.unmake_move(move)
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-            return max_eval
+            return self._evaluate()  # Return evaluation if no moves left
+
+        # Copy before sorting: the list is shared through the move cache
+        all_moves = self._order_moves(list(all_moves), tt_move, ply)
+        alpha_orig, beta_orig = alpha, beta
+        best_move = None
+        best_eval = float('-inf')
+        # Bound methods hoisted out of the move loop
+        make_move = game_state.make_move
+        unmake_move = game_state.unmake_move
+        negamax = self.negamax
+        for i, move in enumerate(all_moves):
+            make_move(move)
+            if i == 0:
+                eval = -negamax(depth - 1, -beta, -alpha, ply + 1)
+            else:
+                eval = -negamax(depth - 1, -alpha - SCOUT_WINDOW, -alpha, ply + 1)
+                if alpha < eval < beta:
+                    eval = -negamax(depth - 1, -beta, -alpha, ply + 1)
+            unmake_move(move)
+            if eval > best_eval:
+                best_eval = eval
+                best_move = move
+            alpha = max(alpha, eval)
+            if alpha >= beta:
+                if not move.isCapture:
+                    self.killers[ply] = move
+                break
+
+        if best_eval <= alpha_orig:
+            flag = UPPER
+        elif best_eval >= beta_orig:
+            flag = LOWER
         else:
-            min_eval = float('inf')
-            for move in all_moves:
-                self.game_state.make_move(move)
-                eval = self.minimax(depth - 1, alpha, beta, True)
-                self.game_state.unmake_move(move)
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-            return min_eval
+            flag = EXACT
+        self.tt[key] = (depth, best_eval, flag, best_move)
+        return best_eval
+
+    def _can_null_move(self):
+        """
+        Null-move pruning is unsafe when the side to move is in check (passing would lose the king)
+        or has only king and pawns left (zugzwang is likely).
+        """
+        gs = self.game_state
+        if gs.whiteToMove:
+            king_sq = gs.whiteKingSq
+            pieces = gs.whiteKnights | gs.whiteBishops | gs.whiteRooks | gs.whiteQueen
+        else:
+            king_sq = gs.blackKingSq
+            pieces = gs.blackKnights | gs.blackBishops | gs.blackRooks | gs.blackQueen
+        if not pieces:
+            return False
+        return not is_square_attacked(gs, king_sq, not gs.whiteToMove)
+
+    def quiesce(self, alpha, beta, ply):
+        """
+        Quiescence search: past the horizon keep playing out captures until the position is quiet,
+        so a leaf is never scored in the middle of an exchange. The side to move may always
+        'stand pat' on the static evaluation instead of capturing.
+        """
+        self.nodes += 1
+        if self.nodes & (POLL_INTERVAL - 1) == 0:
+            self._poll()
+
+        self.analyzed_positions += 1
+        game_state = self.game_state
+        stand_pat = self._evaluate()
+        if stand_pat >= beta or game_state.game_over:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        captures = [move for move in self._generate_moves() if move.isCapture]
+        best_eval = stand_pat
+        make_move = game_state.make_move
+        unmake_move = game_state.unmake_move
+        quiesce = self.quiesce
+        for move in self._order_moves(captures, ply=ply):
+            make_move(move)
+            eval = -quiesce(-beta, -alpha, ply + 1)
+            unmake_move(move)
+            if eval > best_eval:
+                best_eval = eval
+            alpha = max(alpha, eval)
+            if alpha >= beta:
+                break
+        return best_eval
+
+    def _generate_moves(self):
+        """
+        generate_all_moves() for the current position, cached by Zobrist hash since iterative deepening
+        and transpositions visit the same positions repeatedly. When full, the oldest entry is evicted.
+        """
+        game_state = self.game_state
+        key = game_state.zobrist
+        move_cache = self.move_cache
+        moves = move_cache.get(key)
+        if moves is None:
+            moves = generate_all_moves(game_state)
+            if len(move_cache) >= MOVE_CACHE_SIZE:
+                # Dicts keep insertion order, so the first key is the oldest
+                del move_cache[next(iter(move_cache))]
+            move_cache[key] = moves
+        return moves
+
+    def _poll(self):
+        """Periodic check-in from the search: run the progress callback, enforce the deadline and the cancel flag."""
+        if self.progress_callback is not None:
+            self.progress_callback()
+        if self.cancel_event.is_set():
+            raise SearchAborted
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise SearchAborted
+
+    def _evaluate(self):
+        """Static evaluation from the side to move's point of view."""
+        score = evaluate_board(self.game_state)
+        return score if self.game_state.whiteToMove else -score
+
+def _search_moves(game_state, moves, depth, time_left, cancel_event):
+    """
+    Process pool entry point: search each of 'moves' in 'game_state' to 'depth'
+    with a private AIPlayer, stopping after 'time_left' seconds (None for no limit) or once
+    'cancel_event' is set. Return (values, analyzed_positions), values from the side to move's
+    point of view, or None if the search was stopped.
+    """
+    ai = AIPlayer(game_state, depth, time_limit=time_left)
+    ai.cancel_event = cancel_event
+    ai.deadline = None if time_left is None else perf_counter() + time_left
+    values = []
+    try:
+        for move in moves:
+            game_state.make_move(move)
+            values.append(-ai.negamax(depth - 1, float('-inf'), float('inf'), 1))
+            game_state.unmake_move(move)
+    except SearchAborted:
+        # The board is this process's own copy, so it need not be restored
+        return None
+    return values, ai.analyzed_positions
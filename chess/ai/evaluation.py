@@ -1,5 +1,4 @@
 from chess.pieces import ALL_PIECES
-from chess.helpers.bitboard_helpers import test_bit
 from chess.ai.piece_square_tables import PAWN_TABLE, KNIGHT_TABLE, BISHOP_TABLE, ROOK_TABLE, QUEEN_TABLE, KING_TABLE
 from chess.helpers.check_detection import is_square_attacked  # Import the function to check if a square is attacked
 
@@ -13,51 +12,90 @@ PIECE_SQUARE_TABLES = {
     'bP': PAWN_TABLE[::-1], 'bN': KNIGHT_TABLE[::-1], 'bB': BISHOP_TABLE[::-1], 'bR': ROOK_TABLE[::-1], 'bQ': QUEEN_TABLE[::-1], 'bK': KING_TABLE[::-1]
 }
 
+def _build_byte_tables(piece):
+    """
+    Build 8 tables (one per byte of the bitboard, i.e. one per row) of 256 entries each.
+    Entry [i][b] is the summed material + piece-square value of the squares set in byte 'b' of row 'i'.
+    """
+    piece_value = PIECE_VALUES[piece]
+    piece_square_table = PIECE_SQUARE_TABLES[piece]
+    tables = []
+    for i in range(8):
+        table = [0] * 256
+        for b in range(1, 256):
+            lsb = b & -b
+            table[b] = table[b ^ lsb] + piece_value + piece_square_table[8 * i + lsb.bit_length() - 1]
+        tables.append(tuple(table))
+    return tuple(tables)
+
+# piece -> 64 signed material + piece-square scores (positive for White, negative for Black),
+# used by GameState to keep its evaluation score up to date move by move
+PIECE_SQUARE_SCORES = {
+    piece: tuple((1 if piece[0] == 'w' else -1) * (PIECE_VALUES[piece] + PIECE_SQUARE_TABLES[piece][sq])
+                 for sq in range(64))
+    for piece in ALL_PIECES
+}
+
+# piece -> [byte index][byte value] -> summed score
+PIECE_SQUARE_BYTE_TABLES = {piece: _build_byte_tables(piece) for piece in ALL_PIECES}
+
+def _piece_square_score(bitboard, tables):
+    """Material + piece-square score of every piece in 'bitboard', one table lookup per byte."""
+    return (tables[0][bitboard & 0xFF] +
+            tables[1][(bitboard >> 8) & 0xFF] +
+            tables[2][(bitboard >> 16) & 0xFF] +
+            tables[3][(bitboard >> 24) & 0xFF] +
+            tables[4][(bitboard >> 32) & 0xFF] +
+            tables[5][(bitboard >> 40) & 0xFF] +
+            tables[6][(bitboard >> 48) & 0xFF] +
+            tables[7][bitboard >> 56])
+
+_WP, _WN, _WB, _WR, _WQ, _WK, _BP, _BN, _BB, _BR, _BQ, _BK = (
+    PIECE_SQUARE_BYTE_TABLES[piece] for piece in ALL_PIECES
+)
+
+def _eval_core(wp, wn, wb, wr, wq, wk, bp, bn, bb, br, bq, bk):
+    """
+    Material + piece-square balance (White minus Black) of the 12 piece bitboards.
+    Pure integer work on plain ints, kept free of GameState access.
+    """
+    return (_piece_square_score(wp, _WP) + _piece_square_score(wn, _WN) +
+            _piece_square_score(wb, _WB) + _piece_square_score(wr, _WR) +
+            _piece_square_score(wq, _WQ) + _piece_square_score(wk, _WK) -
+            _piece_square_score(bp, _BP) - _piece_square_score(bn, _BN) -
+            _piece_square_score(bb, _BB) - _piece_square_score(br, _BR) -
+            _piece_square_score(bq, _BQ) - _piece_square_score(bk, _BK))
+
+def compute_score(game_state):
+    """Compute the material + piece-square balance of 'game_state' from scratch."""
+    return _eval_core(
+        game_state.whitePawns, game_state.whiteKnights, game_state.whiteBishops,
+        game_state.whiteRooks, game_state.whiteQueen, game_state.whiteKing,
+        game_state.blackPawns, game_state.blackKnights, game_state.blackBishops,
+        game_state.blackRooks, game_state.blackQueen, game_state.blackKing
+    )
+
 def evaluate_board(game_state):
     """
-    Evaluate the board based on material count and piece-square tables.
+    Evaluate the board based on material count and piece-square tables,
+    read from the score the game state keeps up to date in make_move/unmake_move.
     Return -1000 if the white king is missing and 1000 if the black king is missing.
     Penalize positions where the king is in danger.
     """
-    if game_state.whiteKing == 0:
+    white_king_sq = game_state.whiteKingSq
+    black_king_sq = game_state.blackKingSq
+    if white_king_sq is None:
         return -1000  # White king is missing, black wins
-    if game_state.blackKing == 0:
+    if black_king_sq is None:
         return 1000  # Black king is missing, white wins
 
-    white_material = 0
-    black_material = 0
-
-    for piece, bitboard in {
-        'wP': game_state.whitePawns,
-        'wN': game_state.whiteKnights,
-        'wB': game_state.whiteBishops,
-        'wR': game_state.whiteRooks,
-        'wQ': game_state.whiteQueen,
-        'wK': game_state.whiteKing,
-        'bP': game_state.blackPawns,
-        'bN': game_state.blackKnights,
-        'bB': game_state.blackBishops,
-        'bR': game_state.blackRooks,
-        'bQ': game_state.blackQueen,
-        'bK': game_state.blackKing
-    }.items():
-        piece_value = PIECE_VALUES[piece]
-        piece_square_table = PIECE_SQUARE_TABLES[piece]
-
-        for sq in range(64):
-            if test_bit(bitboard, sq):
-                if piece.startswith('w'):
-                    white_material += piece_value + piece_square_table[sq]
-                else:
-                    black_material += piece_value + piece_square_table[sq]
+    score = game_state.eval_score
 
     # Penalize positions where the king is in danger
-    white_king_sq = game_state.whiteKing.bit_length() - 1
-    black_king_sq = game_state.blackKing.bit_length() - 1
-
     if is_square_attacked(game_state, white_king_sq, False):
-        white_material -= 50  # Adjust the penalty value as needed
+        score -= 50  # Adjust the penalty value as needed
     if is_square_attacked(game_state, black_king_sq, True):
-        black_material -= 50  # Adjust the penalty value as needed
+        score += 50  # Adjust the penalty value as needed
+
+    return score
 
-    return white_material - black_material
@@ -1,17 +1,22 @@
 # chess/bitboard.py
 # Common bitboard utilities.
 
+from .move import Move
+
+# BIT[sq] == 1 << sq, precomputed: indexing a tuple is cheaper than building the shifted int
+BIT = tuple(1 << sq for sq in range(64))
+
 def set_bit(bitboard: int, sq: int) -> int:
     """Set the bit at 'sq' to 1."""
-    return bitboard | (1 << sq)
+    return bitboard | BIT[sq]
 
 def clear_bit(bitboard: int, sq: int) -> int:
     """Set the bit at 'sq' to 0."""
-    return bitboard & ~(1 << sq)
+    return bitboard & ~BIT[sq]
 
 def test_bit(bitboard: int, sq: int) -> bool:
     """Check if bit at 'sq' is 1."""
-    return (bitboard & (1 << sq)) != 0
+    return (bitboard & BIT[sq]) != 0
 
 def coords_to_square(row: int, col: int) -> int:
     """
@@ -20,13 +25,31 @@ def coords_to_square(row: int, col: int) -> int:
     """
     return row * 8 + col
 
+# square -> (row, col), precomputed
+SQUARE_COORDS = tuple((sq // 8, sq % 8) for sq in range(64))
+
 def square_to_coords(sq: int) -> tuple[int, int]:
     """
     Convert [0..63] -> (row, col).
     row = sq // 8, col = sq % 8
     """
-    return (sq // 8, sq % 8)
+    return SQUARE_COORDS[sq]
 
 def in_bounds(row: int, col: int) -> bool:
     """Check if 0 <= row,col < 8."""
-    return 0 <= row < 8 and 0 <= col < 8
\ No newline at end of file
+    return 0 <= row < 8 and 0 <= col < 8
+# Whole-board masks (row 0 is the top of the board, col 0 the left edge)
+FULL_BOARD = (1 << 64) - 1
+FILE_A = 0x0101010101010101  # col 0
+FILE_H = FILE_A << 7         # col 7
+ROW_MASKS = tuple(0xFF << (8 * row) for row in range(8))
+
+def moves_from_targets(piece: str, sq: int, targets: int, opponent_occupancy: int, moves: list) -> None:
+    """
+    Append a Move from 'sq' to every set bit of 'targets', lowest first,
+    popping one bit at a time so only occupied squares are visited.
+    """
+    while targets:
+        target = targets & -targets
+        targets ^= target
+        moves.append(Move(piece, sq, target.bit_length() - 1, isCapture=(target & opponent_occupancy) != 0))
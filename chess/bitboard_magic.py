@@ -0,0 +1,68 @@
+# chess/bitboard_magic.py
+# Sliding piece (rook/bishop) attack tables indexed by blocker occupancy.
+#
+# Like magic bitboards, each square has a mask of the squares whose occupancy can
+# block its rays, and a table holding the attack set for every blocker subset of that
+# mask. Where C engines turn 'occupancy & mask' into a dense index with a magic
+# multiply and shift, a Python dict hashes the masked occupancy directly.
+
+from .bitboard import coords_to_square, square_to_coords, in_bounds
+
+ROOK_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+BISHOP_DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+def _ray_attacks(sq: int, occupancy: int, directions) -> int:
+    """Attacked squares along 'directions' from 'sq', each ray stopping at (and including) the first blocker."""
+    row, col = square_to_coords(sq)
+    attacks = 0
+    for dr, dc in directions:
+        r, c = row + dr, col + dc
+        while in_bounds(r, c):
+            bit = 1 << coords_to_square(r, c)
+            attacks |= bit
+            if occupancy & bit:
+                break
+            r += dr
+            c += dc
+    return attacks
+
+def _blocker_mask(sq: int, directions) -> int:
+    """Squares whose occupancy matters for the rays from 'sq' (the last square of each ray never blocks anything)."""
+    row, col = square_to_coords(sq)
+    mask = 0
+    for dr, dc in directions:
+        r, c = row + dr, col + dc
+        while in_bounds(r + dr, c + dc):
+            mask |= 1 << coords_to_square(r, c)
+            r += dr
+            c += dc
+    return mask
+
+def _build_tables(directions):
+    """Build (masks, attacks): per square the blocker mask and a dict {blockers: attack bitboard}."""
+    masks = []
+    attacks = []
+    for sq in range(64):
+        mask = _blocker_mask(sq, directions)
+        table = {}
+        # Enumerate every subset of 'mask' (carry-rippler trick)
+        blockers = 0
+        while True:
+            table[blockers] = _ray_attacks(sq, blockers, directions)
+            blockers = (blockers - mask) & mask
+            if blockers == 0:
+                break
+        masks.append(mask)
+        attacks.append(table)
+    return tuple(masks), tuple(attacks)
+
+ROOK_MASKS, ROOK_ATTACKS = _build_tables(ROOK_DIRECTIONS)
+BISHOP_MASKS, BISHOP_ATTACKS = _build_tables(BISHOP_DIRECTIONS)
+
+def rook_attacks(sq: int, occupancy: int) -> int:
+    """Squares a rook on 'sq' attacks given the board 'occupancy'."""
+    return ROOK_ATTACKS[sq][occupancy & ROOK_MASKS[sq]]
+
+def bishop_attacks(sq: int, occupancy: int) -> int:
+    """Squares a bishop on 'sq' attacks given the board 'occupancy'."""
+    return BISHOP_ATTACKS[sq][occupancy & BISHOP_MASKS[sq]]
@@ -1,20 +1,18 @@
 class Drawback:
-    def __init__(self, name, description, prune_moves_func):
+    def __init__(self, name, description, prune_moves_func=None, excluded_pieces='', castling_disabled=False):
         self.name = name
         self.description = description
+        # Optional filter over the generated move list, for drawbacks that need to inspect the moves
         self.prune_moves_func = prune_moves_func
-
-def no_knights(game_state, moves):
-    """Prune moves that involve knights."""
-    return [move for move in moves if 'N' not in move.piece]
-
-def no_castling(game_state, moves):
-    """Prune castling moves."""
-    return [move for move in moves if not move.isCastle]
+        # Piece letters ('P', 'N', 'B', 'R', 'Q', 'K') whose moves are never generated
+        self.excluded_pieces = excluded_pieces
+        # If True, castling moves are never generated
+        self.castling_disabled = castling_disabled
 
 # Add more drawbacks as needed
+# Simple drawbacks are applied during move generation; pass a prune_moves_func for anything else
 DRAWBACKS = {
-    'no_knights': Drawback('No Knights', 'You cannot move knights.', no_knights),
-    'no_castling': Drawback('No Castling', 'You cannot castle.', no_castling),
+    'no_knights': Drawback('No Knights', 'You cannot move knights.', excluded_pieces='N'),
+    'no_castling': Drawback('No Castling', 'You cannot castle.', castling_disabled=True),
     # Add more drawbacks here
 }
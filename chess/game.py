@@ -1,11 +1,23 @@
 # chess/game.py
 
 from .bitboard import (
-    set_bit, clear_bit, test_bit, coords_to_square, square_to_coords
+    BIT, set_bit, coords_to_square
 )
 from .pieces import *
 from .move import Move
 from .drawbacks import DRAWBACKS
+from .zobrist import ZOBRIST_PIECE, ZOBRIST_SIDE, ZOBRIST_CASTLING, ZOBRIST_EP, castling_index, compute_hash
+from .ai.evaluation import PIECE_SQUARE_SCORES, compute_score
+
+# Home squares of the kings and rooks, as square indices (row 0 is Black's back rank)
+A8, C8, D8, E8, F8, G8, H8 = (coords_to_square(0, col) for col in (0, 2, 3, 4, 5, 6, 7))
+A1, C1, D1, E1, F1, G1, H1 = (coords_to_square(7, col) for col in (0, 2, 3, 4, 5, 6, 7))
+
+# (king start, king end) -> squares the castling king jumps over, used for 'king en passant'
+CASTLE_PATHS = {
+    (E1, G1): (F1,), (E1, C1): (D1,),
+    (E8, G8): (F8,), (E8, C8): (D8,),
+}
 
 class GameState:
     """
@@ -16,6 +28,8 @@ class GameState:
      - A move history for undo/redo
      - Make/unmake logic for standard or castle moves
      - Drawbacks for each player
+     - An incrementally updated Zobrist hash of the position
+     - An incrementally updated material + piece-square score
     """
 
     def __init__(self, white_drawback=None, black_drawback=None):
@@ -35,11 +49,22 @@ class GameState:
         self.blackQueen   = 0
         self.blackKing    = 0
 
+        # Per-side occupancy, kept up to date alongside the piece bitboards
+        self.whiteOccupancy = 0
+        self.blackOccupancy = 0
+
+        # Square -> piece code ('wP', ...) or None, mirroring the bitboards
+        self.mailbox = [None] * 64
+
+        # Square of each king, or None once it has been captured
+        self.whiteKingSq = None
+        self.blackKingSq = None
+
         # True => White to move, False => Black
         self.whiteToMove = True
 
         # For capturing a king that castled out/through check
-        self.kingGhostSquares = []
+        self.kingGhostSquares = ()
 
         # Move history (stack) for undo
         self.move_history = []
@@ -62,6 +87,12 @@ class GameState:
         # Last move
         self.last_move = None
 
+        # Zobrist hash, kept up to date by make_move/unmake_move
+        self.zobrist = compute_hash(self)
+
+        # Material + piece-square balance (White minus Black), kept up to date by make_move/unmake_move
+        self.eval_score = compute_score(self)
+
     def init_standard_position(self):
         """
         Initialize a standard chess arrangement for White/Black pieces.
@@ -76,7 +107,7 @@ class GameState:
 
         # White moves first
         self.whiteToMove = True
-        self.kingGhostSquares.clear()
+        self.kingGhostSquares = ()
         self.move_history.clear()
         self.en_passant_target = None
         self.last_move = None
@@ -124,19 +155,40 @@ class GameState:
         self.blackQueen = set_bit(self.blackQueen, coords_to_square(0, 3))
         self.blackKing = set_bit(self.blackKing, coords_to_square(0, 4))
 
+        self.sync_incremental_state()
+
+    def sync_incremental_state(self):
+        """
+        Recompute the incrementally maintained fields (Zobrist hash, evaluation score, occupancy, mailbox, king squares) from the bitboards.
+        Call this after editing the bitboards directly, e.g. in Setup Mode.
+        """
+        self.zobrist = compute_hash(self)
+        self.eval_score = compute_score(self)
+        self.whiteOccupancy = (self.whitePawns | self.whiteKnights | self.whiteBishops |
+                               self.whiteRooks | self.whiteQueen | self.whiteKing)
+        self.blackOccupancy = (self.blackPawns | self.blackKnights | self.blackBishops |
+                               self.blackRooks | self.blackQueen | self.blackKing)
+        self.whiteKingSq = self.whiteKing.bit_length() - 1 if self.whiteKing else None
+        self.blackKingSq = self.blackKing.bit_length() - 1 if self.blackKing else None
+        self.mailbox = [None] * 64
+        for piece, attr in PIECE_BITBOARDS.items():
+            bitboard = getattr(self, attr)
+            while bitboard:
+                lsb = bitboard & -bitboard
+                self.mailbox[lsb.bit_length() - 1] = piece
+                bitboard ^= lsb
+
     # ------------------------------------------------------------------
     # Occupancy checks
     # ------------------------------------------------------------------
     def get_white_occupancy(self) -> int:
-        return (self.whitePawns | self.whiteKnights | self.whiteBishops |
-                self.whiteRooks | self.whiteQueen | self.whiteKing)
+        return self.whiteOccupancy
 
     def get_black_occupancy(self) -> int:
-        return (self.blackPawns | self.blackKnights | self.blackBishops |
-                self.blackRooks | self.blackQueen | self.blackKing)
+        return self.blackOccupancy
 
     def get_occupancy(self) -> int:
-        return self.get_white_occupancy() | self.get_black_occupancy()
+        return self.whiteOccupancy | self.blackOccupancy
 
     # ------------------------------------------------------------------
     # Move / unmove
@@ -147,35 +199,57 @@ class GameState:
         If it's castling, record the squares for 'king en passant' and move the rook.
         Then toggle side to move.
         """
-        # 1) Save old snapshot for undo
-        old_pos = self._snapshot()
-        self.move_history.append((move, old_pos))
+        # 1) Save what the move overwrites, for undo
+        undo_state = (
+            self.whiteKingMoved, self.whiteRookAMoved, self.whiteRookHMoved,
+            self.blackKingMoved, self.blackRookAMoved, self.blackRookHMoved,
+            self.en_passant_target,
+            self.kingGhostSquares,
+            self.last_move,
+            self.zobrist,
+            self.eval_score
+        )
+
+        # The piece code's second letter is its type; the steps below that
+        # only apply to some piece types are skipped for the others
+        kind = move.piece[1]
+        is_pawn = kind == 'P'
 
         # 2) If capture => remove the piece from that square
+        captured = capture_sq = None
         if move.isCapture:
-            if move.piece in ['wP', 'bP'] and move.endSq == self.en_passant_target:
+            if is_pawn and move.endSq == self.en_passant_target:
                 # En passant capture
-                capture_sq = move.endSq + (8 if move.piece == 'wP' else -8)
-                self._remove_piece_at_square(capture_sq, self._opposite_side())
+                # The captured pawn is beside the capturer: its row, the target's column
+                capture_sq = (move.startSq & ~7) | (move.endSq & 7)
             else:
-                self._remove_piece_at_square(move.endSq, self._opposite_side())
+                capture_sq = move.endSq
+            captured = self._remove_piece_at_square(capture_sq, self._opposite_side())
 
         # 3) Move the piece on the board
         self._move_piece_on_board(move.piece, move.startSq, move.endSq)
 
-        # 4) Update king/rook movement flags if needed
-        self._update_move_flags(move)
+        rook_move = None
+        self.kingGhostSquares = ()
+        if kind == 'K' or kind == 'R':
+            # 4) Update king/rook movement flags
+            self.zobrist ^= ZOBRIST_CASTLING[castling_index(self)]
+            self._update_move_flags(move)
 
-        # 5) Handle castling => record ghost squares + move the rook
-        self.kingGhostSquares.clear()
-        if move.isCastle:
-            path = self._king_castle_path(move.startSq, move.endSq)
-            self.kingGhostSquares = path
-            self._move_rook_for_castle(move)
+            # 5) Handle castling => record ghost squares + move the rook
+            if move.isCastle:
+                # (a king placed off its home square in Setup Mode castles without a path)
+                self.kingGhostSquares = CASTLE_PATHS.get((move.startSq, move.endSq), ())
+                rook_move = self._move_rook_for_castle(move)
+            self.zobrist ^= ZOBRIST_CASTLING[castling_index(self)]
 
         # 6) Set en passant target square
-        if move.piece in ['wP', 'bP'] and abs(move.startSq - move.endSq) == 16:
-            self.en_passant_target = move.endSq + (8 if move.piece == 'wP' else -8)
+        if self.en_passant_target is not None:
+            self.zobrist ^= ZOBRIST_EP[self.en_passant_target]
+        if is_pawn and abs(move.startSq - move.endSq) == 16:
+            # The skipped square is midway between start and end
+            self.en_passant_target = (move.startSq + move.endSq) >> 1
+            self.zobrist ^= ZOBRIST_EP[self.en_passant_target]
         else:
             self.en_passant_target = None
 
@@ -184,6 +258,9 @@ class GameState:
 
         # 8) Switch side
         self.whiteToMove = not self.whiteToMove
+        self.zobrist ^= ZOBRIST_SIDE
+
+        self.move_history.append((move, (captured, capture_sq, rook_move, undo_state)))
 
     def unmake_move(self, move: Move):
         """
@@ -192,45 +269,59 @@ class GameState:
         """
         if not self.move_history:
             return
-        lastMove, old_state = self.move_history.pop()
+        lastMove, (captured, capture_sq, rook_move, undo_state) = self.move_history.pop()
         if lastMove != move:
             # user tries to revert a move that's not last => do nothing
             return
-        # restore from snapshot
-        self._restore_snapshot(old_state)
-
-    # ------------------------------------------------------------------
-    # Internal snapshot & restore
-    # ------------------------------------------------------------------
-    def _snapshot(self):
-        return (
-            self.whitePawns, self.whiteKnights, self.whiteBishops, self.whiteRooks,
-            self.whiteQueen, self.whiteKing,
-            self.blackPawns, self.blackKnights, self.blackBishops, self.blackRooks,
-            self.blackQueen, self.blackKing,
-            self.whiteToMove,
-            list(self.kingGhostSquares),  # copy
-            # add the movement flags too
-            self.whiteKingMoved, self.whiteRookAMoved, self.whiteRookHMoved,
-            self.blackKingMoved, self.blackRookAMoved, self.blackRookHMoved,
-            self.en_passant_target,
-            self.last_move
-        )
-
-    def _restore_snapshot(self, snap):
-        ( self.whitePawns, self.whiteKnights, self.whiteBishops, self.whiteRooks,
-          self.whiteQueen, self.whiteKing,
-          self.blackPawns, self.blackKnights, self.blackBishops, self.blackRooks,
-          self.blackQueen, self.blackKing,
-          self.whiteToMove,
-          king_ghost_list,
-          self.whiteKingMoved, self.whiteRookAMoved, self.whiteRookHMoved,
+        # play the move backwards, then put back what it overwrote
+        # (the hash and score are restored wholesale, so only the board is updated here)
+        self.whiteToMove = not self.whiteToMove
+        piece = move.piece
+        move_bits = BIT[move.startSq] | BIT[move.endSq]
+        if piece[0] == 'w':
+            self.whiteOccupancy ^= move_bits
+        else:
+            self.blackOccupancy ^= move_bits
+        attr = PIECE_BITBOARDS[piece]
+        setattr(self, attr, getattr(self, attr) ^ move_bits)
+        self.mailbox[move.endSq] = None
+        self.mailbox[move.startSq] = piece
+        if piece == WHITE_KING:
+            self.whiteKingSq = move.startSq
+        elif piece == BLACK_KING:
+            self.blackKingSq = move.startSq
+        if rook_move is not None:
+            rook, oldSq, newSq = rook_move
+            self._move_piece_on_board(rook, newSq, oldSq)
+        if captured is not None:
+            self._put_piece_at_square(captured, capture_sq)
+        ( self.whiteKingMoved, self.whiteRookAMoved, self.whiteRookHMoved,
           self.blackKingMoved, self.blackRookAMoved, self.blackRookHMoved,
           self.en_passant_target,
-          self.last_move
-        ) = snap
+          self.kingGhostSquares,
+          self.last_move,
+          self.zobrist,
+          self.eval_score
+        ) = undo_state
 
-        self.kingGhostSquares = king_ghost_list
+    def make_null_move(self):
+        """
+        Pass the turn without moving (used by the AI's null-move pruning).
+        Clears the en passant target and ghost squares, since passing forfeits those captures.
+        Recorded in move_history as (None, undo state); revert with unmake_null_move().
+        """
+        self.move_history.append((None, (self.en_passant_target, self.kingGhostSquares, self.zobrist)))
+        self.kingGhostSquares = ()
+        if self.en_passant_target is not None:
+            self.zobrist ^= ZOBRIST_EP[self.en_passant_target]
+            self.en_passant_target = None
+        self.whiteToMove = not self.whiteToMove
+        self.zobrist ^= ZOBRIST_SIDE
+
+    def unmake_null_move(self):
+        """Revert the null move made by make_null_move()."""
+        _, (self.en_passant_target, self.kingGhostSquares, self.zobrist) = self.move_history.pop()
+        self.whiteToMove = not self.whiteToMove
 
     # ------------------------------------------------------------------
     # Helpers
@@ -239,143 +330,116 @@ class GameState:
         """Return True if the opposite side is 'white', False if 'black'."""
         return not self.whiteToMove
 
+    def get_piece_at_square(self, sq: int):
+        """
+        Return the piece code ('wP', 'bK', ...) standing on 'sq', or None if it is empty.
+        """
+        return self.mailbox[sq]
+
     def _remove_piece_at_square(self, sq: int, side_is_white: bool):
         """
-        Remove whichever piece is at 'sq' from that side's bitboard.
+        Remove whichever piece is at 'sq' from that side's bitboard and return it.
+        Does nothing (and returns None) if 'sq' holds no piece of that side.
         """
+        piece = self.mailbox[sq]
+        if piece is None or (piece[0] == 'w') != side_is_white:
+            return None
+        self.mailbox[sq] = None
+        bit = BIT[sq]
         if side_is_white:
-            # White piece is captured
-            if test_bit(self.whitePawns, sq):
-                self.whitePawns = clear_bit(self.whitePawns, sq)
-            elif test_bit(self.whiteKnights, sq):
-                self.whiteKnights = clear_bit(self.whiteKnights, sq)
-            elif test_bit(self.whiteBishops, sq):
-                self.whiteBishops = clear_bit(self.whiteBishops, sq)
-            elif test_bit(self.whiteRooks, sq):
-                self.whiteRooks = clear_bit(self.whiteRooks, sq)
-            elif test_bit(self.whiteQueen, sq):
-                self.whiteQueen = clear_bit(self.whiteQueen, sq)
-            elif test_bit(self.whiteKing, sq):
-                self.whiteKing = clear_bit(self.whiteKing, sq)
+            self.whiteOccupancy ^= bit
         else:
-            # Black piece is captured
-            if test_bit(self.blackPawns, sq):
-                self.blackPawns = clear_bit(self.blackPawns, sq)
-            elif test_bit(self.blackKnights, sq):
-                self.blackKnights = clear_bit(self.blackKnights, sq)
-            elif test_bit(self.blackBishops, sq):
-                self.blackBishops = clear_bit(self.blackBishops, sq)
-            elif test_bit(self.blackRooks, sq):
-                self.blackRooks = clear_bit(self.blackRooks, sq)
-            elif test_bit(self.blackQueen, sq):
-                self.blackQueen = clear_bit(self.blackQueen, sq)
-            elif test_bit(self.blackKing, sq):
-                self.blackKing = clear_bit(self.blackKing, sq)
+            self.blackOccupancy ^= bit
+        attr = PIECE_BITBOARDS[piece]
+        setattr(self, attr, getattr(self, attr) ^ bit)
+        self.zobrist ^= ZOBRIST_PIECE[piece][sq]
+        self.eval_score -= PIECE_SQUARE_SCORES[piece][sq]
+        if piece == WHITE_KING:
+            self.whiteKingSq = None
+        elif piece == BLACK_KING:
+            self.blackKingSq = None
+        return piece
 
-    def _move_piece_on_board(self, piece: str, startSq: int, endSq: int):
+    def _put_piece_at_square(self, piece: str, sq: int):
         """
-        Clear bit at startSq, set bit at endSq for the correct piece bitboard.
+        Place 'piece' on the empty square 'sq' (the inverse of _remove_piece_at_square).
         """
-        if piece == WHITE_PAWN:
-            self.whitePawns = clear_bit(self.whitePawns, startSq)
-            self.whitePawns = set_bit(self.whitePawns, endSq)
-        elif piece == WHITE_KNIGHT:
-            self.whiteKnights = clear_bit(self.whiteKnights, startSq)
-            self.whiteKnights = set_bit(self.whiteKnights, endSq)
-        elif piece == WHITE_BISHOP:
-            self.whiteBishops = clear_bit(self.whiteBishops, startSq)
-            self.whiteBishops = set_bit(self.whiteBishops, endSq)
-        elif piece == WHITE_ROOK:
-            self.whiteRooks = clear_bit(self.whiteRooks, startSq)
-            self.whiteRooks = set_bit(self.whiteRooks, endSq)
-        elif piece == WHITE_QUEEN:
-            self.whiteQueen = clear_bit(self.whiteQueen, startSq)
-            self.whiteQueen = set_bit(self.whiteQueen, endSq)
-        elif piece == WHITE_KING:
-            self.whiteKing = clear_bit(self.whiteKing, startSq)
-            self.whiteKing = set_bit(self.whiteKing, endSq)
-        elif piece == BLACK_PAWN:
-            self.blackPawns = clear_bit(self.blackPawns, startSq)
-            self.blackPawns = set_bit(self.blackPawns, endSq)
-        elif piece == BLACK_KNIGHT:
-            self.blackKnights = clear_bit(self.blackKnights, startSq)
-            self.blackKnights = set_bit(self.blackKnights, endSq)
-        elif piece == BLACK_BISHOP:
-            self.blackBishops = clear_bit(self.blackBishops, startSq)
-            self.blackBishops = set_bit(self.blackBishops, endSq)
-        elif piece == BLACK_ROOK:
-            self.blackRooks = clear_bit(self.blackRooks, startSq)
-            self.blackRooks = set_bit(self.blackRooks, endSq)
-        elif piece == BLACK_QUEEN:
-            self.blackQueen = clear_bit(self.blackQueen, startSq)
-            self.blackQueen = set_bit(self.blackQueen, endSq)
+        self.mailbox[sq] = piece
+        bit = BIT[sq]
+        if piece[0] == 'w':
+            self.whiteOccupancy ^= bit
+        else:
+            self.blackOccupancy ^= bit
+        attr = PIECE_BITBOARDS[piece]
+        setattr(self, attr, getattr(self, attr) ^ bit)
+        self.zobrist ^= ZOBRIST_PIECE[piece][sq]
+        self.eval_score += PIECE_SQUARE_SCORES[piece][sq]
+        if piece == WHITE_KING:
+            self.whiteKingSq = sq
         elif piece == BLACK_KING:
-            self.blackKing = clear_bit(self.blackKing, startSq)
-            self.blackKing = set_bit(self.blackKing, endSq)
+            self.blackKingSq = sq
 
-    def _king_castle_path(self, startSq: int, endSq: int) -> list:
+    def _move_piece_on_board(self, piece: str, startSq: int, endSq: int):
         """
-        Return squares the king passes through (excluding the final).
-        e.g. e1->g1 => [60,61]. We pop off the last to exclude 'g1'.
-        This is used for 'king en passant' capturing next turn if the king castled through check.
+        Clear bit at startSq, set bit at endSq for the correct piece bitboard.
+        endSq must be empty and differ from startSq, so a single XOR flips both bits.
         """
-        path = []
-        step = 1 if endSq > startSq else -1
-        current = startSq
-        while current != endSq:
-            path.append(current)
-            current += step
-        # remove the final square from path
-        # because you only want squares the king "jumped over"
-        # not the final position
-        if path:
-            path.pop()
-        return path
+        self.zobrist ^= ZOBRIST_PIECE[piece][startSq] ^ ZOBRIST_PIECE[piece][endSq]
+        scores = PIECE_SQUARE_SCORES[piece]
+        self.eval_score += scores[endSq] - scores[startSq]
+        move_bits = BIT[startSq] | BIT[endSq]
+        if piece[0] == 'w':
+            self.whiteOccupancy ^= move_bits
+        else:
+            self.blackOccupancy ^= move_bits
+        attr = PIECE_BITBOARDS[piece]
+        setattr(self, attr, getattr(self, attr) ^ move_bits)
+        self.mailbox[startSq] = None
+        self.mailbox[endSq] = piece
+        if piece == WHITE_KING:
+            self.whiteKingSq = endSq
+        elif piece == BLACK_KING:
+            self.blackKingSq = endSq
 
     def _move_rook_for_castle(self, move: Move):
         """
         Once the king has moved from e1->g1, we move the rook from h1->f1, etc.
         Also sets the rook's 'moved' flag so no further castling is allowed with that rook.
+        Returns the rook move made as (rook, oldSq, newSq), or None if there was no rook to move.
         """
-        start_row, start_col = square_to_coords(move.startSq)
-        end_row, end_col = square_to_coords(move.endSq)
-
-        if move.piece == WHITE_KING:
-            # e1->g1 => row=7,col=4 -> row=7,col=6 => rook from h1->f1
-            if (start_row, start_col) == (7, 4) and (end_row, end_col) == (7, 6):
-                oldSq = coords_to_square(7, 7)  # h1
-                newSq = coords_to_square(7, 5)  # f1
-                if test_bit(self.whiteRooks, oldSq):
-                    self.whiteRooks = clear_bit(self.whiteRooks, oldSq)
-                    self.whiteRooks = set_bit(self.whiteRooks, newSq)
+        startSq, endSq = move.startSq, move.endSq
+        rook_move = None
+
+        if move.piece == WHITE_KING and startSq == E1:
+            # e1->g1 => rook from h1->f1
+            if endSq == G1:
+                if self.whiteRooks & BIT[H1]:
+                    self._move_piece_on_board(WHITE_ROOK, H1, F1)
+                    rook_move = (WHITE_ROOK, H1, F1)
                 self.whiteRookHMoved = True
-            # e1->c1 => row=7,col=4 -> row=7,col=2 => rook from a1->d1
-            elif (start_row, start_col) == (7, 4) and (end_row, end_col) == (7, 2):
-                oldSq = coords_to_square(7, 0)  # a1
-                newSq = coords_to_square(7, 3)  # d1
-                if test_bit(self.whiteRooks, oldSq):
-                    self.whiteRooks = clear_bit(self.whiteRooks, oldSq)
-                    self.whiteRooks = set_bit(self.whiteRooks, newSq)
+            # e1->c1 => rook from a1->d1
+            elif endSq == C1:
+                if self.whiteRooks & BIT[A1]:
+                    self._move_piece_on_board(WHITE_ROOK, A1, D1)
+                    rook_move = (WHITE_ROOK, A1, D1)
                 self.whiteRookAMoved = True
 
-        elif move.piece == BLACK_KING:
-            # e8->g8 => row=0,col=4 -> row=0,col=6 => rook from h8->f8
-            if (start_row, start_col) == (0, 4) and (end_row, end_col) == (0, 6):
-                oldSq = coords_to_square(0, 7)  # h8
-                newSq = coords_to_square(0, 5)  # f8
-                if test_bit(self.blackRooks, oldSq):
-                    self.blackRooks = clear_bit(self.blackRooks, oldSq)
-                    self.blackRooks = set_bit(self.blackRooks, newSq)
+        elif move.piece == BLACK_KING and startSq == E8:
+            # e8->g8 => rook from h8->f8
+            if endSq == G8:
+                if self.blackRooks & BIT[H8]:
+                    self._move_piece_on_board(BLACK_ROOK, H8, F8)
+                    rook_move = (BLACK_ROOK, H8, F8)
                 self.blackRookHMoved = True
-            # e8->c8 => row=0,col=4 -> row=0,col=2 => rook from a8->d8
-            elif (start_row, start_col) == (0, 4) and (end_row, end_col) == (0, 2):
-                oldSq = coords_to_square(0, 0)  # a8
-                newSq = coords_to_square(0, 3)  # d8
-                if test_bit(self.blackRooks, oldSq):
-                    self.blackRooks = clear_bit(self.blackRooks, oldSq)
-                    self.blackRooks = set_bit(self.blackRooks, newSq)
+            # e8->c8 => rook from a8->d8
+            elif endSq == C8:
+                if self.blackRooks & BIT[A8]:
+                    self._move_piece_on_board(BLACK_ROOK, A8, D8)
+                    rook_move = (BLACK_ROOK, A8, D8)
                 self.blackRookAMoved = True
 
+        return rook_move
+
     def _update_move_flags(self, move: Move):
         """
         If the piece is the king or rook, mark that it has moved
@@ -388,23 +452,22 @@ class GameState:
             self.blackKingMoved = True
         elif piece == WHITE_ROOK:
             # Distinguish a1 from h1
-            if move.startSq == coords_to_square(7, 0):
+            if move.startSq == A1:
                 self.whiteRookAMoved = True
-            elif move.startSq == coords_to_square(7, 7):
+            elif move.startSq == H1:
                 self.whiteRookHMoved = True
         elif piece == BLACK_ROOK:
             # Distinguish a8 from h8
-            if move.startSq == coords_to_square(0, 0):
+            if move.startSq == A8:
                 self.blackRookAMoved = True
-            elif move.startSq == coords_to_square(0, 7):
+            elif move.startSq == H8:
                 self.blackRookHMoved = True
 
     def prune_moves(self, moves):
         """
         Prune moves based on the current player's drawback.
         """
-        if self.whiteToMove and self.white_drawback:
-            return self.white_drawback.prune_moves_func(self, moves)
-        elif not self.whiteToMove and self.black_drawback:
-            return self.black_drawback.prune_moves_func(self, moves)
+        drawback = self.white_drawback if self.whiteToMove else self.black_drawback
+        if drawback and drawback.prune_moves_func:
+            return drawback.prune_moves_func(self, moves)
         return moves
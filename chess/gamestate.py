@@ -1,14 +1,57 @@
 # game_state.py
 
 from .bitboard import (
-    test_bit, set_bit, clear_bit, coords_to_square, square_to_coords, in_bounds
+    BIT, set_bit, coords_to_square, ROW_MASKS
 )
 from .pieces import *
 from .move import Move
 from .drawbacks import DRAWBACKS
-from .helpers.bitboard_helpers import move_piece_on_board, remove_piece_at_square
-from .movegen import generate_all_moves
+from .helpers.bitboard_helpers import move_piece_on_board, remove_piece_at_square, put_piece_at_square
+from .movegen import has_any_moves
 from .helpers.check_detection import is_square_attacked, get_attackers
+from .zobrist import ZOBRIST_PIECE, ZOBRIST_SIDE, ZOBRIST_CASTLING, ZOBRIST_EP, castling_index, compute_hash
+
+# Set to True to trace moves, undos and game-over decisions on stdout
+DEBUG = False
+
+# Home squares of the kings and rooks, as square indices (row 0 is Black's back rank)
+A8, C8, D8, E8, F8, G8, H8 = (coords_to_square(0, col) for col in (0, 2, 3, 4, 5, 6, 7))
+A1, C1, D1, E1, F1, G1, H1 = (coords_to_square(7, col) for col in (0, 2, 3, 4, 5, 6, 7))
+
+# Starting-position bitboards (Black's pieces on rows 0-1, White's on rows 6-7)
+def _back_rank(row: int, *cols: int) -> int:
+    """Bitboard of the given columns on one row."""
+    return sum(1 << coords_to_square(row, col) for col in cols)
+
+_START_WHITE_PAWNS   = ROW_MASKS[6]
+_START_WHITE_KNIGHTS = _back_rank(7, 1, 6)
+_START_WHITE_BISHOPS = _back_rank(7, 2, 5)
+_START_WHITE_ROOKS   = _back_rank(7, 0, 7)
+_START_WHITE_QUEEN   = _back_rank(7, 3)
+_START_WHITE_KING    = _back_rank(7, 4)
+
+_START_BLACK_PAWNS   = ROW_MASKS[1]
+_START_BLACK_KNIGHTS = _back_rank(0, 1, 6)
+_START_BLACK_BISHOPS = _back_rank(0, 2, 5)
+_START_BLACK_ROOKS   = _back_rank(0, 0, 7)
+_START_BLACK_QUEEN   = _back_rank(0, 3)
+_START_BLACK_KING    = _back_rank(0, 4)
+
+# (king start, king end) -> bitboard of the squares the castling king stands on or passes through
+_CASTLE_PATH = {
+    (E1, G1): (1 << E1) | (1 << F1) | (1 << G1),
+    (E1, C1): (1 << E1) | (1 << D1) | (1 << C1),
+    (E8, G8): (1 << E8) | (1 << F8) | (1 << G8),
+    (E8, C8): (1 << E8) | (1 << D8) | (1 << C8),
+}
+
+# (king start, king end) -> (rook, rook start, rook end, the rook's 'moved' flag)
+_CASTLE_ROOK_MOVE = {
+    (E1, G1): (WHITE_ROOK, H1, F1, 'whiteRookHMoved'),
+    (E1, C1): (WHITE_ROOK, A1, D1, 'whiteRookAMoved'),
+    (E8, G8): (BLACK_ROOK, H8, F8, 'blackRookHMoved'),
+    (E8, C8): (BLACK_ROOK, A8, D8, 'blackRookAMoved'),
+}
 
 class GameState:
     """
@@ -21,8 +64,9 @@ class GameState:
         self._initialize_flags()
         self._initialize_drawbacks(white_drawback, black_drawback)
         self.halfmove_clock = 0
-        self.repetition_history = {}
+        self.repetition_history = {}  # Zobrist hash -> number of occurrences
         self.game_over = False  # Ensure game_over attribute is initialized
+        self.zobrist = compute_hash(self)
 
     def _initialize_bitboards(self):
         """Initialize piece bitboards."""
@@ -40,12 +84,19 @@ class GameState:
         self.blackQueen   = 0
         self.blackKing    = 0
 
+        # Per-side occupancy, kept up to date by the piece-moving helpers
+        self.whiteOccupancy = 0
+        self.blackOccupancy = 0
+
     def _initialize_flags(self):
         """Initialize flags and other state variables."""
         self.whiteToMove = True
         self.pawnGhostSquares = 0  # For pawn en passant
         self.kingGhostSquares = 0  # For king en passant
         self.move_history = []
+        # Bound once, since every make/unmake goes through them
+        self._hist_append = self.move_history.append
+        self._hist_pop = self.move_history.pop
 
         self.whiteKingMoved    = False
         self.whiteRookAMoved   = False  # a1
@@ -61,6 +112,11 @@ class GameState:
         """Initialize drawbacks for both players."""
         self.white_drawback = DRAWBACKS.get(white_drawback)
         self.black_drawback = DRAWBACKS.get(black_drawback)
+        # Each side's move filter (or None), resolved once: (White's, Black's)
+        self._prune_fns = tuple(
+            drawback.prune_moves_func if drawback else None
+            for drawback in (self.white_drawback, self.black_drawback)
+        )
 
     def init_standard_position(self):
         """Set up the board with the standard chess starting position."""
@@ -70,282 +126,259 @@ class GameState:
         self.repetition_history = {}
         self.game_over = False  # Reset game_over flag
 
-        # White pawns on row=6
-        for col in range(8):
-            sq = coords_to_square(6, col)
-            self.whitePawns = set_bit(self.whitePawns, sq)
-
-        # White rooks, knights, bishops, queen, king on row=7
-        self.whiteRooks = set_bit(self.whiteRooks, coords_to_square(7, 0))
-        self.whiteRooks = set_bit(self.whiteRooks, coords_to_square(7, 7))
-        self.whiteKnights = set_bit(self.whiteKnights, coords_to_square(7, 1))
-        self.whiteKnights = set_bit(self.whiteKnights, coords_to_square(7, 6))
-        self.whiteBishops = set_bit(self.whiteBishops, coords_to_square(7, 2))
-        self.whiteBishops = set_bit(self.whiteBishops, coords_to_square(7, 5))
-        self.whiteQueen = set_bit(self.whiteQueen, coords_to_square(7, 3))
-        self.whiteKing = set_bit(self.whiteKing, coords_to_square(7, 4))
-
-        # Black pawns on row=1
-        for col in range(8):
-            sq = coords_to_square(1, col)
-            self.blackPawns = set_bit(self.blackPawns, sq)
-
-        # Black rooks, knights, bishops, queen, king on row=0
-        self.blackRooks = set_bit(self.blackRooks, coords_to_square(0, 0))
-        self.blackRooks = set_bit(self.blackRooks, coords_to_square(0, 7))
-        self.blackKnights = set_bit(self.blackKnights, coords_to_square(0, 1))
-        self.blackKnights = set_bit(self.blackKnights, coords_to_square(0, 6))
-        self.blackBishops = set_bit(self.blackBishops, coords_to_square(0, 2))
-        self.blackBishops = set_bit(self.blackBishops, coords_to_square(0, 5))
-        self.blackQueen = set_bit(self.blackQueen, coords_to_square(0, 3))
-        self.blackKing = set_bit(self.blackKing, coords_to_square(0, 4))
+        self.whitePawns   = _START_WHITE_PAWNS
+        self.whiteKnights = _START_WHITE_KNIGHTS
+        self.whiteBishops = _START_WHITE_BISHOPS
+        self.whiteRooks   = _START_WHITE_ROOKS
+        self.whiteQueen   = _START_WHITE_QUEEN
+        self.whiteKing    = _START_WHITE_KING
+
+        self.blackPawns   = _START_BLACK_PAWNS
+        self.blackKnights = _START_BLACK_KNIGHTS
+        self.blackBishops = _START_BLACK_BISHOPS
+        self.blackRooks   = _START_BLACK_ROOKS
+        self.blackQueen   = _START_BLACK_QUEEN
+        self.blackKing    = _START_BLACK_KING
+
+        self.whiteOccupancy = ROW_MASKS[6] | ROW_MASKS[7]
+        self.blackOccupancy = ROW_MASKS[0] | ROW_MASKS[1]
+        self.zobrist = compute_hash(self)
 
     def get_white_occupancy(self) -> int:
         """Return bitboard of all white pieces."""
-        return (self.whitePawns | self.whiteKnights | self.whiteBishops |
-                self.whiteRooks | self.whiteQueen | self.whiteKing)
+        return self.whiteOccupancy
 
     def get_black_occupancy(self) -> int:
         """Return bitboard of all black pieces."""
-        return (self.blackPawns | self.blackKnights | self.blackBishops |
-                self.blackRooks | self.blackQueen | self.blackKing)
+        return self.blackOccupancy
 
     def get_occupancy(self) -> int:
         """Return bitboard of all pieces."""
-        return self.get_white_occupancy() | self.get_black_occupancy()
+        return self.whiteOccupancy | self.blackOccupancy
 
     def make_move(self, move: Move):
-        """Make a move on the board."""
+        """Make a move on the board, then check whether it ended the game."""
         if self.game_over:
-            print("Game is already over. No more moves can be made.")
+            if DEBUG:
+                print("Game is already over. No more moves can be made.")
             return
 
-        # 1. Save snapshot for undo
-        old_pos = self._snapshot()
-        self.move_history.append((move, old_pos))
+        self._apply_move(move)
+
+        # Check if the king of the player opposite to the one who moved is missing
+        if (not self.whiteToMove and self.whiteKing == 0) or (self.whiteToMove and self.blackKing == 0):
+            self.game_over = True
+            if DEBUG:
+                if not self.whiteToMove:
+                    print("Black wins! White king is missing.")
+                else:
+                    print("White wins! Black king is missing.")
+            return
+
+        # The draw rules can't trigger right after a capture or pawn move (clock reset to 0)
+        if self.halfmove_clock:
+            # Check for draw by repetition (the position was counted by _apply_move)
+            if self._is_threefold_repetition():
+                if DEBUG:
+                    print("Threefold repetition detected. Game is a draw.")
+                self._end_game()
+
+            # Check for 50-move rule
+            if self.halfmove_clock >= 50:
+                if DEBUG:
+                    print("50-move rule reached. Game is a draw.")
+                self._end_game()
+
+        # Check for loss condition (no legal moves)
+        if not self._has_legal_moves():
+            if DEBUG:
+                print("Player loses due to no legal moves.")
+            self._end_game()
+
+    def _apply_move(self, move: Move):
+        """
+        Update the board for a move, without any game-over detection.
+        Search and other engine loops pair this with unmake_move.
+        """
+        # 1. Save what the move overwrites, for undo
+        undo_state = (
+            self.whiteKingMoved, self.whiteRookAMoved, self.whiteRookHMoved,
+            self.blackKingMoved, self.blackRookAMoved, self.blackRookHMoved,
+            self.en_passant_target,
+            self.pawnGhostSquares,
+            self.kingGhostSquares,
+            self.halfmove_clock,
+            self.game_over,
+            self.zobrist,
+            self.repetition_history
+        )
+        captured = capture_sq = rook_move = None
 
         # 2. Clear own ghost squares at the start of the move
         self.kingGhostSquares = 0
 
         # 3. Check if the move.endSq is in opponent's ghost squares
-        if test_bit(self.kingGhostSquares, move.endSq):
+        if self.kingGhostSquares & BIT[move.endSq]:
             # Capture the opponent's king
             if self.whiteToMove:
-                self.blackKing = clear_bit(self.blackKing, move.endSq)
-                print("White captures Black King via King En Passant!")
+                self.blackKing &= ~BIT[move.endSq]
+                self.blackOccupancy &= ~BIT[move.endSq]
+                self.zobrist ^= ZOBRIST_PIECE[BLACK_KING][move.endSq]
             else:
-                self.whiteKing = clear_bit(self.whiteKing, move.endSq)
-                print("Black captures White King via King En Passant!")
+                self.whiteKing &= ~BIT[move.endSq]
+                self.whiteOccupancy &= ~BIT[move.endSq]
+                self.zobrist ^= ZOBRIST_PIECE[WHITE_KING][move.endSq]
             # Set game over flag
             self.game_over = True
             # Toggle side to move (optional, since game is over)
             self.whiteToMove = not self.whiteToMove
+            self.zobrist ^= ZOBRIST_SIDE
+            self._update_repetition_history()
+            # The capturing piece stays where it is
+            king = BLACK_KING if not self.whiteToMove else WHITE_KING
+            self._hist_append((move, (king, move.endSq, None, False, undo_state)))
             return  # Exit after capturing the king
 
+        # The piece code's second letter is its type; the steps below that
+        # only apply to some piece types are skipped for the others
+        kind = move.piece[1]
+        is_pawn = kind == 'P'
+
         # 4. Handle captures
         if move.isCapture:
-            if move.piece in ['wP','bP'] and move.endSq == self.en_passant_target:
+            if is_pawn and move.endSq == self.en_passant_target:
                 # En passant capture for pawns
-                capture_sq = move.endSq + (8 if move.piece == 'wP' else -8)
-                remove_piece_at_square(capture_sq, self._opposite_side(), self)
-                print(f"En Passant Capture at square {capture_sq}.")
-            elif test_bit(self.kingGhostSquares, move.endSq):
-                # Capture via King En Passant
-                remove_piece_at_square(move.endSq, self._opposite_side(), self)
-                print(f"King captured at square {move.endSq} via King En Passant.")
+                # The captured pawn is beside the capturer: its row, the target's column
+                capture_sq = (move.startSq & ~7) | (move.endSq & 7)
             else:
                 # Regular capture
-                remove_piece_at_square(move.endSq, self._opposite_side(), self)
-                print(f"Captured piece at square {move.endSq}.")
-
-            # Reset halfmove clock after a capture
+                capture_sq = move.endSq
+            captured = remove_piece_at_square(capture_sq, self._opposite_side(), self)
+            if captured:
+                self.zobrist ^= ZOBRIST_PIECE[captured][capture_sq]
+
+        # A capture or pawn move can't be reversed, so no earlier position can recur:
+        # reset the halfmove clock and start a fresh history (the old one is kept,
+        # not copied, in undo_state)
+        if move.isCapture or is_pawn:
             self.halfmove_clock = 0
+            self.repetition_history = {}
         else:
-            # Increment halfmove clock if no capture or pawn move
             self.halfmove_clock += 1
 
         # 5. Move the piece
         move_piece_on_board(move.piece, move.startSq, move.endSq, self)
-        print(f"Moved {move.piece} from {move.startSq} to {move.endSq}.")
-
-        # 6. Update movement flags if necessary
-        self._update_move_flags(move)
-
-        # 7. Handle castling
-        if move.isCastle:
-            path = self._king_castle_path(move.startSq, move.endSq)
-            # Set ghost squares for King En Passant
-            for sq in path:
-                self.kingGhostSquares = set_bit(self.kingGhostSquares, sq)
-            self.kingGhostSquares = set_bit(self.kingGhostSquares, move.startSq)
-            self.kingGhostSquares = set_bit(self.kingGhostSquares, move.endSq)
-            self._move_rook_for_castle(move)
-            print("Castling move handled.")
+        self.zobrist ^= ZOBRIST_PIECE[move.piece][move.startSq] ^ ZOBRIST_PIECE[move.piece][move.endSq]
+
+        # 6. Update movement flags (only king and rook moves affect castling)
+        if kind == 'K' or kind == 'R':
+            self.zobrist ^= ZOBRIST_CASTLING[castling_index(self)]
+            self._update_move_flags(move)
+
+            # 7. Handle castling
+            if move.isCastle:
+                # Set ghost squares for King En Passant
+                # (a king placed off its home square in Setup Mode castles without a path)
+                self.kingGhostSquares |= _CASTLE_PATH.get((move.startSq, move.endSq), 0)
+                rook_move = self._move_rook_for_castle(move)
+            self.zobrist ^= ZOBRIST_CASTLING[castling_index(self)]
 
         # 8. Handle en passant target
-        if move.piece in ['wP', 'bP'] and abs(move.startSq - move.endSq) == 16:
-            direction = -8 if move.piece == 'wP' else 8
-            self.en_passant_target = move.endSq + direction
-            self.pawnGhostSquares = set_bit(self.pawnGhostSquares, self.en_passant_target)
-            print(f"En Passant target set at square {self.en_passant_target}.")
+        if self.en_passant_target is not None:
+            self.zobrist ^= ZOBRIST_EP[self.en_passant_target]
+        if is_pawn and abs(move.startSq - move.endSq) == 16:
+            # The skipped square is midway between start and end
+            self.en_passant_target = (move.startSq + move.endSq) >> 1
+            self.zobrist ^= ZOBRIST_EP[self.en_passant_target]
+            self.pawnGhostSquares |= BIT[self.en_passant_target]
         else:
             self.en_passant_target = None
 
         # 9. Toggle side to move
         self.whiteToMove = not self.whiteToMove
-        print(f"Turn toggled. White to move: {self.whiteToMove}")
-
-        # 10. Clear opponent's ghost squares if it's their turn now
-        self.kingGhostSquares = 0
-
-        # 11. Check if the king of the player opposite to the one who moved is missing
-        if (not self.whiteToMove and self.whiteKing == 0) or (self.whiteToMove and self.blackKing == 0):
-            self.game_over = True
-            if not self.whiteToMove:
-                print("Black wins! White king is missing.")
-            else:
-                print("White wins! Black king is missing.")
-            return
-
-        # 12. Update repetition history and check for draw conditions
+        self.zobrist ^= ZOBRIST_SIDE
         self._update_repetition_history()
-        if self._is_threefold_repetition():
-            print("Threefold repetition detected. Game is a draw.")
-            self._end_game()
 
-        # 13. Check for 50-move rule
-        if self.halfmove_clock >= 50:
-            print("50-move rule reached. Game is a draw.")
-            self._end_game()
+        self._hist_append((move, (captured, capture_sq, rook_move, True, undo_state)))
 
-        # 14. Check for loss condition (no legal moves)
-        if not self._has_legal_moves():
-            print("Player loses due to no legal moves.")
-            self._end_game()
+        # 10. Clear opponent's ghost squares if it's their turn now
+        self.kingGhostSquares = 0
 
     def unmake_move(self, move: Move):
         """Undo the last move."""
         if not self.move_history:
-            print("No moves to unmake.")
+            if DEBUG:
+                print("No moves to unmake.")
             return
-        lastMove, old_state = self.move_history.pop()
+        lastMove, (captured, capture_sq, rook_move, piece_moved, undo_state) = self._hist_pop()
         if lastMove != move:
-            print("The move to unmake does not match the last move made.")
+            if DEBUG:
+                print("The move to unmake does not match the last move made.")
             return
-        self._restore_snapshot(old_state)
-        print(f"Move {move} has been undone.")
 
-    def prune_moves(self, moves):
-        """Prune moves based on the current player's drawback."""
-        if self.whiteToMove and self.white_drawback:
-            pruned = self.white_drawback.prune_moves_func(self, moves)
-            print(f"Pruned moves for White: {len(moves)} -> {len(pruned)}")
-            return pruned
-        elif not self.whiteToMove and self.black_drawback:
-            pruned = self.black_drawback.prune_moves_func(self, moves)
-            print(f"Pruned moves for Black: {len(moves)} -> {len(pruned)}")
-            return pruned
-        print("No pruning applied to moves.")
-        return moves
-
-    def _snapshot(self):
-        """Take a snapshot of the current game state."""
-        return (
-            self.whitePawns, self.whiteKnights, self.whiteBishops, self.whiteRooks,
-            self.whiteQueen, self.whiteKing,
-            self.blackPawns, self.blackKnights, self.blackBishops, self.blackRooks,
-            self.blackQueen, self.blackKing,
-            self.whiteToMove,
-            self.pawnGhostSquares,
-            self.whiteKingGhostSquares,
-            self.blackKingGhostSquares,
-            self.whiteKingMoved, self.whiteRookAMoved, self.whiteRookHMoved,
-            self.blackKingMoved, self.blackRookAMoved, self.blackRookHMoved,
-            self.en_passant_target,
-            self.halfmove_clock,
-            self.repetition_history.copy(),
-            self.game_over  # Added game_over here
-        )
+        # Forget the position this move reached (make_move counted it once)
+        count = self.repetition_history[self.zobrist] - 1
+        if count:
+            self.repetition_history[self.zobrist] = count
+        else:
+            del self.repetition_history[self.zobrist]
 
-    def _restore_snapshot(self, snap):
-        """Restore the game state from a snapshot."""
+        # Play the move backwards, then put back what it overwrote
+        self.whiteToMove = not self.whiteToMove
+        if piece_moved:
+            move_piece_on_board(move.piece, move.endSq, move.startSq, self)
+        if rook_move is not None:
+            rook, oldSq, newSq = rook_move
+            move_piece_on_board(rook, newSq, oldSq, self)
+        if captured is not None:
+            put_piece_at_square(captured, capture_sq, self)
         (
-            self.whitePawns, self.whiteKnights, self.whiteBishops, self.whiteRooks,
-            self.whiteQueen, self.whiteKing,
-            self.blackPawns, self.blackKnights, self.blackBishops, self.blackRooks,
-            self.blackQueen, self.blackKing,
-            self.whiteToMove,
-            self.pawnGhostSquares,
-            self.whiteKingGhostSquares,
-            self.blackKingGhostSquares,
             self.whiteKingMoved, self.whiteRookAMoved, self.whiteRookHMoved,
             self.blackKingMoved, self.blackRookAMoved, self.blackRookHMoved,
             self.en_passant_target,
+            self.pawnGhostSquares,
+            self.kingGhostSquares,
             self.halfmove_clock,
-            self.repetition_history,
-            self.game_over  # Added game_over here
-        ) = snap
+            self.game_over,
+            self.zobrist,
+            self.repetition_history
+        ) = undo_state
+        if DEBUG:
+            print(f"Move {move} has been undone.")
+
+    def prune_moves(self, moves):
+        """Prune moves based on the current player's drawback."""
+        prune = self._prune_fns[0 if self.whiteToMove else 1]
+        if prune is None:
+            return moves
+        return prune(self, moves)
 
     def _opposite_side(self) -> bool:
         """Return the opposite side to move."""
         return not self.whiteToMove
 
-    def _king_castle_path(self, startSq: int, endSq: int) -> list:
-        """Return the path of squares the king moves through when castling."""
-        path = []
-        step = 1 if endSq > startSq else -1
-        current = startSq
-        while current != endSq:
-            path.append(current)
-            current += step
-        if path:
-            path.pop()  # Exclude the final square
-        return path
-
     def _move_rook_for_castle(self, move: Move):
-        """Move the rook when castling."""
-        start_row, start_col = square_to_coords(move.startSq)
-        end_row, end_col = square_to_coords(move.endSq)
-
-        if move.piece == WHITE_KING:
-            if (start_row, start_col) == (7, 4) and (end_row, end_col) == (7, 6):
-                # Kingside castling for White: Move rook from h1 to f1
-                oldSq = coords_to_square(7, 7)  # h1
-                newSq = coords_to_square(7, 5)  # f1
-                if test_bit(self.whiteRooks, oldSq):
-                    self.whiteRooks = clear_bit(self.whiteRooks, oldSq)
-                    self.whiteRooks = set_bit(self.whiteRooks, newSq)
-                    print(f"White Rook moved from {oldSq} to {newSq}.")
-                self.whiteRookHMoved = True
-            elif (start_row, start_col) == (7, 4) and (end_row, end_col) == (7, 2):
-                # Queenside castling for White: Move rook from a1 to d1
-                oldSq = coords_to_square(7, 0)  # a1
-                newSq = coords_to_square(7, 3)  # d1
-                if test_bit(self.whiteRooks, oldSq):
-                    self.whiteRooks = clear_bit(self.whiteRooks, oldSq)
-                    self.whiteRooks = set_bit(self.whiteRooks, newSq)
-                    print(f"White Rook moved from {oldSq} to {newSq}.")
-                self.whiteRookAMoved = True
-
-        elif move.piece == BLACK_KING:
-            if (start_row, start_col) == (0, 4) and (end_row, end_col) == (0, 6):
-                # Kingside castling for Black: Move rook from h8 to f8
-                oldSq = coords_to_square(0, 7)  # h8
-                newSq = coords_to_square(0, 5)  # f8
-                if test_bit(self.blackRooks, oldSq):
-                    self.blackRooks = clear_bit(self.blackRooks, oldSq)
-                    self.blackRooks = set_bit(self.blackRooks, newSq)
-                    print(f"Black Rook moved from {oldSq} to {newSq}.")
-                self.blackRookHMoved = True
-            elif (start_row, start_col) == (0, 4) and (end_row, end_col) == (0, 2):
-                # Queenside castling for Black: Move rook from a8 to d8
-                oldSq = coords_to_square(0, 0)  # a8
-                newSq = coords_to_square(0, 3)  # d8
-                if test_bit(self.blackRooks, oldSq):
-                    self.blackRooks = clear_bit(self.blackRooks, oldSq)
-                    self.blackRooks = set_bit(self.blackRooks, newSq)
-                    print(f"Black Rook moved from {oldSq} to {newSq}.")
-                self.blackRookAMoved = True
+        """Move the rook when castling. Return the rook move as (rook, oldSq, newSq), or None if no rook moved."""
+        castle = _CASTLE_ROOK_MOVE.get((move.startSq, move.endSq))
+        if castle is None:
+            # Not a castle from the king's home square: there is no rook to move
+            return None
+        rook, oldSq, newSq, moved_flag = castle
+        rook_move = None
+        move_bits = BIT[oldSq] | BIT[newSq]
+        if rook == WHITE_ROOK:
+            if self.whiteRooks & BIT[oldSq]:
+                self.whiteRooks ^= move_bits
+                self.whiteOccupancy ^= move_bits
+                rook_move = (rook, oldSq, newSq)
+        elif self.blackRooks & BIT[oldSq]:
+            self.blackRooks ^= move_bits
+            self.blackOccupancy ^= move_bits
+            rook_move = (rook, oldSq, newSq)
+        if rook_move is not None:
+            self.zobrist ^= ZOBRIST_PIECE[rook][oldSq] ^ ZOBRIST_PIECE[rook][newSq]
+        setattr(self, moved_flag, True)
+        return rook_move
 
     def _update_move_flags(self, move: Move):
         """Update flags based on the move made."""
@@ -355,53 +388,36 @@ class GameState:
         elif piece == BLACK_KING:
             self.blackKingMoved = True
         elif piece == WHITE_ROOK:
-            if move.startSq == coords_to_square(7, 0):
+            if move.startSq == A1:
                 self.whiteRookAMoved = True
-            elif move.startSq == coords_to_square(7, 7):
+            elif move.startSq == H1:
                 self.whiteRookHMoved = True
         elif piece == BLACK_ROOK:
-            if move.startSq == coords_to_square(0, 0):
+            if move.startSq == A8:
                 self.blackRookAMoved = True
-            elif move.startSq == coords_to_square(0, 7):
+            elif move.startSq == H8:
                 self.blackRookHMoved = True
 
     def _update_repetition_history(self):
         """Update the repetition history for threefold repetition detection."""
-        board_state = (
-            self.whitePawns, self.whiteKnights, self.whiteBishops, self.whiteRooks,
-            self.whiteQueen, self.whiteKing,
-            self.blackPawns, self.blackKnights, self.blackBishops, self.blackRooks,
-            self.blackQueen, self.blackKing,
-            self.whiteToMove
-        )
-        if board_state in self.repetition_history:
-            self.repetition_history[board_state] += 1
-        else:
-            self.repetition_history[board_state] = 1
+        self.repetition_history[self.zobrist] = self.repetition_history.get(self.zobrist, 0) + 1
 
     def _is_threefold_repetition(self) -> bool:
-        """Check if the current board state has occurred three times."""
-        board_state = (
-            self.whitePawns, self.whiteKnights, self.whiteBishops, self.whiteRooks,
-            self.whiteQueen, self.whiteKing,
-            self.blackPawns, self.blackKnights, self.blackBishops, self.blackRooks,
-            self.blackQueen, self.blackKing,
-            self.whiteToMove
-        )
-        return self.repetition_history.get(board_state, 0) >= 3
+        """Check if the current position (keyed by its Zobrist hash) has occurred three times."""
+        return self.repetition_history.get(self.zobrist, 0) >= 3
 
     def _has_legal_moves(self) -> bool:
         """Check if the current player has any legal moves."""
-        all_moves = generate_all_moves(self)
-        return len(all_moves) > 0
+        return has_any_moves(self)
 
     def _end_game(self):
         """End the game."""
         self.game_over = True
-        if not self.whiteToMove:
-            print("White wins!")
-        else:
-            print("Black wins!")
+        if DEBUG:
+            if not self.whiteToMove:
+                print("White wins!")
+            else:
+                print("Black wins!")
         # Implement additional game over logic here (e.g., display message, reset game, etc.)
 
 def path_bitboard(path: list) -> int:
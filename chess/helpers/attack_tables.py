@@ -0,0 +1,26 @@
+# chess/helpers/attack_tables.py
+# Precomputed attack bitboards, indexed by square.
+
+from chess.bitboard import coords_to_square, square_to_coords, in_bounds
+
+def _build_leaper_attacks(offsets):
+    """For each square, the bitboard of squares reached by the (dr, dc) 'offsets' that stay on the board."""
+    table = []
+    for sq in range(64):
+        row, col = square_to_coords(sq)
+        attacks = 0
+        for dr, dc in offsets:
+            if in_bounds(row + dr, col + dc):
+                attacks |= 1 << coords_to_square(row + dr, col + dc)
+        table.append(attacks)
+    return tuple(table)
+
+# square -> bitboard of squares a knight on it attacks
+KNIGHT_ATTACKS = _build_leaper_attacks([(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)])
+
+# square -> bitboard of squares a king on it attacks
+KING_ATTACKS = _build_leaper_attacks([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+
+# square -> bitboard of squares a pawn on it attacks (White moves towards row 0, Black towards row 7)
+WHITE_PAWN_ATTACKS = _build_leaper_attacks([(-1, -1), (-1, 1)])
+BLACK_PAWN_ATTACKS = _build_leaper_attacks([(1, -1), (1, 1)])
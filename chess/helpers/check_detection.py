@@ -1,10 +1,53 @@
-from chess.bitboard import test_bit, coords_to_square, square_to_coords, in_bounds
+from chess.bitboard_magic import rook_attacks, bishop_attacks
+from chess.helpers.attack_tables import KNIGHT_ATTACKS, KING_ATTACKS, WHITE_PAWN_ATTACKS, BLACK_PAWN_ATTACKS
 from chess.movegen import generate_all_moves
 
 def is_square_attacked(game_state, square, by_white):
     """
-    Check if a square is attacked by the opponent.
+    Check if a square is attacked by the given side.
+    Looks outwards from the square with the attack tables, cheapest pieces first,
+    instead of generating the attacker's moves.
     """
+    if square is None:
+        return False
+    if by_white:
+        pawns, knights, bishops = game_state.whitePawns, game_state.whiteKnights, game_state.whiteBishops
+        rooks, queens, king = game_state.whiteRooks, game_state.whiteQueen, game_state.whiteKing
+        drawback = game_state.white_drawback
+        # A white pawn attacks this square from where a black pawn on it would attack
+        pawn_sources = BLACK_PAWN_ATTACKS[square]
+    else:
+        pawns, knights, bishops = game_state.blackPawns, game_state.blackKnights, game_state.blackBishops
+        rooks, queens, king = game_state.blackRooks, game_state.blackQueen, game_state.blackKing
+        drawback = game_state.black_drawback
+        pawn_sources = WHITE_PAWN_ATTACKS[square]
+
+    # A side without its king has no moves at all
+    if not king:
+        return False
+    if drawback:
+        # A move filter can forbid any capture, so only its moves can tell
+        if drawback.prune_moves_func:
+            return _is_square_attacked_by_moves(game_state, square, by_white)
+        # Pieces the drawback forbids moving attack nothing
+        excluded = drawback.excluded_pieces
+        if excluded:
+            if 'P' in excluded: pawns = 0
+            if 'N' in excluded: knights = 0
+            if 'B' in excluded: bishops = 0
+            if 'R' in excluded: rooks = 0
+            if 'Q' in excluded: queens = 0
+            if 'K' in excluded: king = 0
+
+    if pawn_sources & pawns or KNIGHT_ATTACKS[square] & knights or KING_ATTACKS[square] & king:
+        return True
+    occupancy = game_state.whiteOccupancy | game_state.blackOccupancy
+    # Queens attack along both the bishop and the rook lines
+    return bool(bishop_attacks(square, occupancy) & (bishops | queens) or
+                rook_attacks(square, occupancy) & (rooks | queens))
+
+def _is_square_attacked_by_moves(game_state, square, by_white):
+    """Check if any move the given side could make ends on the square."""
     original_white_to_move = game_state.whiteToMove
     game_state.whiteToMove = by_white
     opponent_moves = generate_all_moves(game_state)
@@ -48,72 +91,31 @@ def get_attackers(sq: int, by_white: bool, game_state) -> list:
 
 def is_attacked_by_pawn(sq: int, by_white: bool, game_state) -> bool:
     """Check if the square is attacked by a pawn."""
-    row, col = square_to_coords(sq)
+    # A pawn attacks the square from where an opposing pawn on it would attack
     if by_white:
-        return (in_bounds(row - 1, col - 1) and test_bit(game_state.whitePawns, coords_to_square(row - 1, col - 1))) or \
-               (in_bounds(row - 1, col + 1) and test_bit(game_state.whitePawns, coords_to_square(row - 1, col + 1)))
-    else:
-        return (in_bounds(row + 1, col - 1) and test_bit(game_state.blackPawns, coords_to_square(row + 1, col - 1))) or \
-               (in_bounds(row + 1, col + 1) and test_bit(game_state.blackPawns, coords_to_square(row + 1, col + 1)))
+        return bool(BLACK_PAWN_ATTACKS[sq] & game_state.whitePawns)
+    return bool(WHITE_PAWN_ATTACKS[sq] & game_state.blackPawns)
 
 def is_attacked_by_knight(sq: int, by_white: bool, game_state) -> bool:
     """Check if the square is attacked by a knight."""
-    row, col = square_to_coords(sq)
-    knight_moves = [
-        (row + 2, col + 1), (row + 2, col - 1), (row - 2, col + 1), (row - 2, col - 1),
-        (row + 1, col + 2), (row + 1, col - 2), (row - 1, col + 2), (row - 1, col - 2)
-    ]
-    for r, c in knight_moves:
-        if in_bounds(r, c):
-            if by_white and test_bit(game_state.whiteKnights, coords_to_square(r, c)):
-                return True
-            if not by_white and test_bit(game_state.blackKnights, coords_to_square(r, c)):
-                return True
-    return False
+    return bool(KNIGHT_ATTACKS[sq] & (game_state.whiteKnights if by_white else game_state.blackKnights))
 
 def is_attacked_by_bishop(sq: int, by_white: bool, game_state) -> bool:
     """Check if the square is attacked by a bishop."""
-    directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-    return is_attacked_by_sliding_piece(sq, by_white, directions, game_state.whiteBishops, game_state.blackBishops, game_state)
+    bishops = game_state.whiteBishops if by_white else game_state.blackBishops
+    return bool(bishop_attacks(sq, game_state.get_occupancy()) & bishops)
 
 def is_attacked_by_rook(sq: int, by_white: bool, game_state) -> bool:
     """Check if the square is attacked by a rook."""
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    return is_attacked_by_sliding_piece(sq, by_white, directions, game_state.whiteRooks, game_state.blackRooks, game_state)
+    rooks = game_state.whiteRooks if by_white else game_state.blackRooks
+    return bool(rook_attacks(sq, game_state.get_occupancy()) & rooks)
 
 def is_attacked_by_queen(sq: int, by_white: bool, game_state) -> bool:
     """Check if the square is attacked by a queen."""
-    directions = [(-1, -1), (-1, 1), (1, -1), (1, 1), (-1, 0), (1, 0), (0, -1), (0, 1)]
-    return is_attacked_by_sliding_piece(sq, by_white, directions, game_state.whiteQueen, game_state.blackQueen, game_state)
+    queens = game_state.whiteQueen if by_white else game_state.blackQueen
+    occupancy = game_state.get_occupancy()
+    return bool((bishop_attacks(sq, occupancy) | rook_attacks(sq, occupancy)) & queens)
 
 def is_attacked_by_king(sq: int, by_white: bool, game_state) -> bool:
     """Check if the square is attacked by a king."""
-    row, col = square_to_coords(sq)
-    king_moves = [
-        (row + 1, col), (row - 1, col), (row, col + 1), (row, col - 1),
-        (row + 1, col + 1), (row + 1, col - 1), (row - 1, col + 1), (row - 1, col - 1)
-    ]
-    for r, c in king_moves:
-        if in_bounds(r, c):
-            if by_white and test_bit(game_state.whiteKing, coords_to_square(r, c)):
-                return True
-            if not by_white and test_bit(game_state.blackKing, coords_to_square(r, c)):
-                return True
-    return False
-
-def is_attacked_by_sliding_piece(sq: int, by_white: bool, directions: list, white_bitboard: int, black_bitboard: int, game_state) -> bool:
-    """Check if the square is attacked by a sliding piece (bishop, rook, queen)."""
-    row, col = square_to_coords(sq)
-    for dr, dc in directions:
-        r, c = row + dr, col + dc
-        while in_bounds(r, c):
-            target_sq = coords_to_square(r, c)
-            if by_white and test_bit(white_bitboard, target_sq):
-                return True
-            if not by_white and test_bit(black_bitboard, target_sq):
-                return True
-            if test_bit(game_state.get_occupancy(), target_sq):
-                break
-            r += dr
-            c += dc
-    return False
+    return bool(KING_ATTACKS[sq] & (game_state.whiteKing if by_white else game_state.blackKing))
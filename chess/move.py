@@ -1,4 +1,7 @@
 class Move:
+    # Fixed attribute layout: no per-instance __dict__, so moves are smaller and cheaper to create
+    __slots__ = ('piece', 'startSq', 'endSq', 'isCapture', 'isCastle')
+
     def __init__(self, piece, startSq, endSq, isCapture=False, isCastle=False):
         self.piece = piece
         self.startSq = startSq
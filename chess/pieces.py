@@ -19,3 +19,11 @@ ALL_PIECES = [
     WHITE_PAWN, WHITE_KNIGHT, WHITE_BISHOP, WHITE_ROOK, WHITE_QUEEN, WHITE_KING,
     BLACK_PAWN, BLACK_KNIGHT, BLACK_BISHOP, BLACK_ROOK, BLACK_QUEEN, BLACK_KING
 ]
+
+# Name of the GameState attribute holding each piece's bitboard
+PIECE_BITBOARDS = {
+    WHITE_PAWN: 'whitePawns', WHITE_KNIGHT: 'whiteKnights', WHITE_BISHOP: 'whiteBishops',
+    WHITE_ROOK: 'whiteRooks', WHITE_QUEEN: 'whiteQueen', WHITE_KING: 'whiteKing',
+    BLACK_PAWN: 'blackPawns', BLACK_KNIGHT: 'blackKnights', BLACK_BISHOP: 'blackBishops',
+    BLACK_ROOK: 'blackRooks', BLACK_QUEEN: 'blackQueen', BLACK_KING: 'blackKing',
+}
@@ -0,0 +1,62 @@
+# chess/zobrist.py
+# Random keys for Zobrist hashing of positions.
+
+import random
+
+from .pieces import ALL_PIECES
+
+# Fixed seed so hashes are reproducible between runs.
+_rng = random.Random(20240101)
+
+# One key per (piece, square)
+ZOBRIST_PIECE = {
+    piece: tuple(_rng.getrandbits(64) for _ in range(64))
+    for piece in ALL_PIECES
+}
+
+# XORed in when it is Black's turn
+ZOBRIST_SIDE = _rng.getrandbits(64)
+
+# One key per combination of the 6 king/rook 'moved' flags
+ZOBRIST_CASTLING = tuple(_rng.getrandbits(64) for _ in range(64))
+
+# One key per en passant target square
+ZOBRIST_EP = tuple(_rng.getrandbits(64) for _ in range(64))
+
+def castling_index(game_state) -> int:
+    """Pack the 6 king/rook 'moved' flags into an index for ZOBRIST_CASTLING."""
+    return (game_state.whiteKingMoved
+            | game_state.whiteRookAMoved << 1
+            | game_state.whiteRookHMoved << 2
+            | game_state.blackKingMoved << 3
+            | game_state.blackRookAMoved << 4
+            | game_state.blackRookHMoved << 5)
+
+def compute_hash(game_state) -> int:
+    """Compute the Zobrist hash of 'game_state' from scratch."""
+    h = 0
+    for piece, bitboard in (
+        ('wP', game_state.whitePawns),
+        ('wN', game_state.whiteKnights),
+        ('wB', game_state.whiteBishops),
+        ('wR', game_state.whiteRooks),
+        ('wQ', game_state.whiteQueen),
+        ('wK', game_state.whiteKing),
+        ('bP', game_state.blackPawns),
+        ('bN', game_state.blackKnights),
+        ('bB', game_state.blackBishops),
+        ('bR', game_state.blackRooks),
+        ('bQ', game_state.blackQueen),
+        ('bK', game_state.blackKing),
+    ):
+        keys = ZOBRIST_PIECE[piece]
+        while bitboard:
+            lsb = bitboard & -bitboard
+            h ^= keys[lsb.bit_length() - 1]
+            bitboard ^= lsb
+    if not game_state.whiteToMove:
+        h ^= ZOBRIST_SIDE
+    h ^= ZOBRIST_CASTLING[castling_index(game_state)]
+    if game_state.en_passant_target is not None:
+        h ^= ZOBRIST_EP[game_state.en_passant_target]
+    return h
@@ -1,5 +1,7 @@
 import pygame
 import sys
+import copy
+from concurrent.futures import ThreadPoolExecutor
 
 from chess.game import GameState
 from chess.movegen import generate_all_moves
@@ -54,15 +56,17 @@ def drawPieces(win, state: GameState):
     Draw the pieces on the board according to the bitboards in 'state'.
     """
     def drawBitboard(bitboard, piece_code):
-        for sq in range(64):
-            if test_bit(bitboard, sq):
-                r, c = square_to_coords(sq)
-                pieceImg = IMAGES.get(piece_code)
-                if pieceImg:
-                    win.blit(pieceImg, (c * SQUARE_SIZE, r * SQUARE_SIZE + BOARD_OFFSET_Y))
-                else:
-                    # If image is missing, draw a placeholder
-                    pygame.draw.circle(win, (255, 0, 0), (c * SQUARE_SIZE + SQUARE_SIZE // 2, r * SQUARE_SIZE + BOARD_OFFSET_Y + SQUARE_SIZE // 2), SQUARE_SIZE // 2)
+        # Visit only the set bits, lowest square first
+        while bitboard:
+            lsb = bitboard & -bitboard
+            bitboard ^= lsb
+            r, c = square_to_coords(lsb.bit_length() - 1)
+            pieceImg = IMAGES.get(piece_code)
+            if pieceImg:
+                win.blit(pieceImg, (c * SQUARE_SIZE, r * SQUARE_SIZE + BOARD_OFFSET_Y))
+            else:
+                # If image is missing, draw a placeholder
+                pygame.draw.circle(win, (255, 0, 0), (c * SQUARE_SIZE + SQUARE_SIZE // 2, r * SQUARE_SIZE + BOARD_OFFSET_Y + SQUARE_SIZE // 2), SQUARE_SIZE // 2)
 
     # White pieces
     drawBitboard(state.whitePawns,   'wP')
@@ -145,8 +149,10 @@ def main():
     gameState = GameState()
     gameState.init_standard_position()
 
-    # Initialize AI player
+    # Initialize AI player; it searches in a worker thread so the window keeps redrawing while it thinks
     ai_player = AIPlayer(gameState)
+    ai_executor = ThreadPoolExecutor(max_workers=1)
+    ai_future = None  # Pending select_move() while the AI is thinking
 
     # Selection variables for AI and Manual modes
     selectedSquare = None      # (row, col) for the piece the user selected
@@ -171,6 +177,17 @@ def main():
         manual_button_hovered = MANUAL_BUTTON_X <= mouse_x <= MANUAL_BUTTON_X + BUTTON_WIDTH and BUTTON_Y <= mouse_y <= BUTTON_Y + BUTTON_HEIGHT
         setup_button_hovered = SETUP_BUTTON_X <= mouse_x <= SETUP_BUTTON_X + BUTTON_WIDTH and BUTTON_Y <= mouse_y <= BUTTON_Y + BUTTON_HEIGHT
 
+        # Play the AI move once the worker thread has finished its search
+        if ai_future is not None and ai_future.done():
+            ai_move = ai_future.result()
+            ai_future = None
+            if ai_move:
+                gameState.make_move(ai_move)
+                # Update AI search info
+                current_depth = ai_player.depth
+                current_evaluation = ai_player.current_evaluation
+                analyzed_positions = ai_player.analyzed_positions
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
@@ -199,6 +216,8 @@ def main():
 
                     if not (0 <= row < 8 and 0 <= col < 8):
                         continue  # Clicked outside the board
+                    if ai_future is not None:
+                        continue  # The AI is still thinking
 
                     sq = coords_to_square(row, col)
 
@@ -207,6 +226,7 @@ def main():
                             # Remove any piece (white or black) at the clicked square
                             gameState._remove_piece_at_square(sq, True)
                             gameState._remove_piece_at_square(sq, False)
+                            gameState.sync_incremental_state()
                             # Clear selection if the removed piece was selected
                             if selectedSquareSetup == (row, col):
                                 selectedSquareSetup = None
@@ -237,13 +257,14 @@ def main():
                                     selectedPieceSetup = piece_at_sq
                             else:
                                 # Move the selected piece to the new square
-                                # Remove any piece at the destination
-                                gameState._remove_piece_at_square(sq, True)
-                                gameState._remove_piece_at_square(sq, False)
-                                # Move the piece
-                                gameState._remove_piece_at_square(coords_to_square(*selectedSquareSetup), True)
-                                gameState._remove_piece_at_square(coords_to_square(*selectedSquareSetup), False)
-                                gameState._move_piece_on_board(selectedPieceSetup, sq, sq)
+                                fromSq = coords_to_square(*selectedSquareSetup)
+                                if fromSq != sq:
+                                    # Remove any piece at the destination
+                                    gameState._remove_piece_at_square(sq, True)
+                                    gameState._remove_piece_at_square(sq, False)
+                                    # Move the piece
+                                    gameState._move_piece_on_board(selectedPieceSetup, fromSq, sq)
+                                    gameState.sync_incremental_state()
                                 # Clear selection after moving
                                 selectedSquareSetup = None
                                 selectedPieceSetup = None
@@ -262,13 +283,9 @@ def main():
                                 gameState.make_move(chosenMove)
                                 # AI makes a move if in AI mode
                                 if mode == 'AI':
-                                    ai_move = ai_player.select_move()
-                                    if ai_move:
-                                        gameState.make_move(ai_move)
-                                        # Update AI search info
-                                        current_depth = ai_player.depth
-                                        current_evaluation = ai_player.current_evaluation
-                                        analyzed_positions = ai_player.analyzed_positions
+                                    # Search a private copy so the displayed board is not touched mid-search
+                                    ai_player.game_state = copy.deepcopy(gameState)
+                                    ai_future = ai_executor.submit(ai_player.select_move)
                                 # Clear selections after move
                                 selectedSquare = None
                                 movesForSelected = []
@@ -318,6 +335,9 @@ def main():
 
         pygame.display.flip()
 
+    # Stop a search that is still running before exiting
+    ai_player.cancel()
+    ai_executor.shutdown(cancel_futures=True)
     pygame.quit()
     sys.exit()
 